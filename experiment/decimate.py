@@ -0,0 +1,124 @@
+"""
+File: decimate.py
+Date created: 19 Oct 2026
+
+Description:
+Shape-preserving decimation of plotted curves (ROC, TPR/FPR), so that
+figure files stay small regardless of how many results were tested.
+Collinear points are removed first (no visible change), then the
+Largest-Triangle-Three-Buckets (LTTB) algorithm reduces what remains
+to a fixed pixel budget. Key operating points are always retained.
+"""
+import numpy as np
+
+
+# GLOBAL VARIABLE(s)
+# Maximum number of vertices sent to PyPlot for one curve
+PIXEL_BUDGET = 1000
+
+# Tolerance for treating three points as collinear, as the sine of the
+# angle turned at the middle point (independent of segment length, so the
+# tiny steps of very large ROC curves are never mistaken for straight runs)
+COLLINEAR_TOL = 1e-9
+
+
+"""
+Function:    collinear_mask
+Description: Marks the points of a polyline which are not needed to
+             draw it, i.e. interior points of straight segments.
+Inputs:      Arrays of x and y coordinates (same length), and the
+             tolerance for the turning angle test.
+Outputs:     Boolean array, True where the point must be kept.
+"""
+def collinear_mask(x, y, tol = COLLINEAR_TOL):
+	keep = np.ones(len(x), dtype = bool)
+	if len(x) < 3:
+		return keep
+
+	# Segments a -> b and b -> c of each consecutive triple (a, b, c)
+	dx = np.diff(x)
+	dy = np.diff(y)
+
+	# Cross product, relative to the segment lengths (sine of the angle)
+	cross = dx[:-1] * dy[1:] - dy[:-1] * dx[1:]
+	lengths = np.hypot(dx[:-1], dy[:-1]) * np.hypot(dx[1:], dy[1:])
+
+	# Repeated points (zero length) are also redundant
+	keep[1:-1] = np.abs(cross) > tol * lengths
+
+	return keep
+
+
+"""
+Function:    lttb
+Description: Largest-Triangle-Three-Buckets downsampling. Picks, from each
+             bucket, the point forming the largest triangle with the
+             previously chosen point and the average of the next bucket.
+Inputs:      Arrays of x and y coordinates (x sorted), and the number of
+             points to output.
+Outputs:     Sorted array of the indices of the chosen points.
+"""
+def lttb(x, y, n_out):
+	n_in = len(x)
+	if n_out >= n_in or n_out < 3:
+		return np.arange(n_in)
+
+	# Bucket boundaries for the interior points (first/last always kept)
+	edges = np.linspace(1, n_in - 1, n_out - 1).astype(int)
+
+	out = np.empty(n_out, dtype = int)
+	out[0] = 0
+	out[-1] = n_in - 1
+
+	prev = 0
+	for b in range(n_out - 2):
+		start, stop = edges[b], edges[b + 1]
+
+		# Average of the following bucket (or the final point)
+		if b + 2 < len(edges):
+			nxt = slice(edges[b + 1], edges[b + 2])
+			avg_x = x[nxt].mean()
+			avg_y = y[nxt].mean()
+		else:
+			avg_x = x[-1]
+			avg_y = y[-1]
+
+		area = np.abs( (x[prev] - avg_x) * (y[start:stop] - y[prev])
+		             - (x[prev] - x[start:stop]) * (avg_y - y[prev]) )
+
+		prev = start + int(np.argmax(area))
+		out[b + 1] = prev
+
+	return out
+
+
+"""
+Function:    decimate_curve
+Description: Reduces a curve to at most budget vertices (plus any key
+             points) while preserving its shape.
+Inputs:      Arrays of x and y coordinates, the pixel budget and an
+             optional list of indices which must be retained (e.g.
+             operating points of interest).
+Outputs:     Tuple (x, y, indices) of the decimated curve, where
+             indices refer to the input arrays.
+"""
+def decimate_curve(x, y, budget = PIXEL_BUDGET, keep = None):
+	x = np.asarray(x, dtype = float)
+	y = np.asarray(y, dtype = float)
+
+	# Undefined values cannot be decimated meaningfully, leave as is
+	if np.isnan(x).any() or np.isnan(y).any():
+		return x, y, np.arange(len(x))
+
+	# Lossless step: drop interior points of straight segments
+	indices = np.flatnonzero(collinear_mask(x, y))
+
+	# Lossy step: only if still above budget
+	if len(indices) > budget:
+		chosen = lttb(x[indices], y[indices], budget)
+		indices = indices[chosen]
+
+	if keep is not None:
+		indices = np.union1d(indices, np.asarray(keep, dtype = int))
+
+	return x[indices], y[indices], indices
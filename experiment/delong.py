@@ -0,0 +1,202 @@
+"""
+File: delong.py
+Date created: 19 Oct 2026
+
+Description:
+Tests whether the differences in AUC between LLM detectors are
+significant, using the fast DeLong algorithm for correlated ROC curves
+(Sun & Xu, 2014), which is O(N log N) per comparison. Detectors are
+compared on the abstracts they were both tested on (same doi and same
+version, original or rewritten). Outputs a pairwise p-value matrix, and
+for every pair of detectors in DETECTORS the number of shared texts, the
+AUCs on them and their 2x2 covariance (detectors tested on different
+texts have no single valid covariance matrix).
+"""
+import csv
+import itertools
+import numpy as np
+from scipy import stats
+
+import join_index
+
+
+# GLOBAL VARIABLE(s)
+# List of tuples, with the form (filename, plot_label)
+DETECTORS = [ ("data/GPTZero_tests.csv", "GPTZero"),
+	      ("data/Scispace_tests.csv", "Scispace"),
+	      ("data/Isgen_tests.csv", "Isgen"),
+	      ("data/Writefull_tests.csv", "Writefull") ]
+
+# Output files
+PVALUES_FILE = "delong_pvalues.csv"
+PAIRS_FILE = "delong_pairs.csv"
+
+
+"""
+Function:    fast_delong
+Description: Fast DeLong AUC and covariance for k correlated ROC curves
+             measured on the same texts.
+Inputs:      Array of scores of shape (k, N) and array of N labels
+             (1 = rewritten, the positive class).
+Outputs:     Tuple (aucs, cov), array of k AUCs and (k, k) covariance.
+"""
+def fast_delong(scores, labels):
+	scores = np.atleast_2d(scores)
+	labels = np.asarray(labels)
+
+	pos = scores[:, labels == 1]
+	neg = scores[:, labels == 0]
+	m = pos.shape[1]
+	n = neg.shape[1]
+
+	# Midranks within each class and over both classes
+	tx = stats.rankdata(pos, axis = 1)
+	ty = stats.rankdata(neg, axis = 1)
+	tz = stats.rankdata(np.hstack((pos, neg)), axis = 1)
+
+	aucs = tz[:, :m].sum(axis = 1) / m / n - (m + 1.0) / (2.0 * n)
+
+	# Structural components
+	v01 = (tz[:, :m] - tx) / n
+	v10 = 1.0 - (tz[:, m:] - ty) / m
+
+	sx = np.atleast_2d(np.cov(v01))
+	sy = np.atleast_2d(np.cov(v10))
+	cov = sx / m + sy / n
+
+	return aucs, cov
+
+
+"""
+Function:    delong_pvalue
+Description: Two-sided p-value for the difference between two
+             correlated AUCs.
+Inputs:      Array of two AUCs and their (2, 2) covariance.
+Outputs:     p-value (nan if the difference has no variance).
+"""
+def delong_pvalue(aucs, cov):
+	var = cov[0, 0] + cov[1, 1] - 2 * cov[0, 1]
+	if not var > 0:
+		return np.nan
+
+	z = np.abs(aucs[0] - aucs[1]) / np.sqrt(var)
+	return 2 * stats.norm.sf(z)
+
+
+"""
+Function:    compare_detectors
+Description: Runs pairwise DeLong tests across all detectors, each pair
+             being joined on the texts they share. The AUCs, covariance
+             and p-value of a pair all come from those shared texts.
+Inputs:      List of detector tuples (as in DETECTORS).
+Outputs:     Tuple (names, aucs, pairs), where aucs is computed on each
+             detector's own results and pairs is a list of tuples
+             (i, j, n_or, n_re, pair_aucs, pair_cov, pvalue), pair_cov
+             being the (2, 2) covariance of pair_aucs (pairs sharing
+             fewer than two texts of each label have nan results).
+"""
+def compare_detectors(detectors):
+	names = [ detector[1] for detector in detectors ]
+	keys, labels, scores, mask = join_index.build_index(detectors)
+	k = len(detectors)
+
+	# Single detector AUC (on all of its own results)
+	aucs = np.full(k, np.nan)
+	for i in range(k):
+		rows = mask[:, i]
+		if min(np.sum(labels[rows] == 1), np.sum(labels[rows] == 0)) > 0:
+			aucs[i] = fast_delong(scores[rows, i], labels[rows])[0][0]
+
+	# Paired comparisons on shared texts
+	pairs = []
+	for i, j in itertools.combinations(range(k), 2):
+		rows = mask[:, i] & mask[:, j]
+		n_re = int(np.sum(labels[rows] == 1))
+		n_or = int(np.sum(labels[rows] == 0))
+
+		# Need at least two of each class for a covariance estimate
+		if min(n_or, n_re) < 2:
+			pairs.append((i, j, n_or, n_re, np.full(2, np.nan),
+				      np.full((2, 2), np.nan), np.nan))
+			continue
+
+		pair_aucs, pair_cov = fast_delong(scores[rows][:, [i, j]].T, labels[rows])
+		pairs.append((i, j, n_or, n_re, pair_aucs, pair_cov,
+			      delong_pvalue(pair_aucs, pair_cov)))
+
+	return names, aucs, pairs
+
+
+"""
+Function:    pvalue_matrix
+Description: Arranges the pairwise p-values as a square matrix.
+Inputs:      Number of detectors and list of pairs (as from
+             compare_detectors).
+Outputs:     (k, k) array of p-values (1 on the diagonal).
+"""
+def pvalue_matrix(k, pairs):
+	pvalues = np.eye(k)
+	for i, j, _, _, _, _, pvalue in pairs:
+		pvalues[i, j] = pvalues[j, i] = pvalue
+	return pvalues
+
+
+"""
+Function:    write_matrix
+Description: Writes a labelled square matrix to a csv file.
+Inputs:      Row/column names, the matrix and the output filename.
+Outputs:     None
+"""
+def write_matrix(names, matrix, filename):
+	with open(filename, "w+") as outfile:
+		writer = csv.writer(outfile)
+
+		writer.writerow([""] + names)
+		for name, row in zip(names, matrix):
+			writer.writerow([name] + [ f"{val:.6g}" for val in row ])
+
+
+"""
+Function:    write_pairs
+Description: Writes every pairwise comparison to a csv file: the number
+             of shared texts, the AUCs on them, their covariance and the
+             p-value.
+Inputs:      Detector names, list of pairs (as from compare_detectors) and
+             the output filename.
+Outputs:     None
+"""
+def write_pairs(names, pairs, filename):
+	with open(filename, "w+") as outfile:
+		writer = csv.writer(outfile)
+
+		writer.writerow(["detector_a", "detector_b", "n_original", "n_modified",
+				 "auc_a", "auc_b", "var_a", "var_b", "cov_ab", "pvalue"])
+		for i, j, n_or, n_re, pair_aucs, pair_cov, pvalue in pairs:
+			values = [pair_aucs[0], pair_aucs[1], pair_cov[0, 0], pair_cov[1, 1],
+				  pair_cov[0, 1], pvalue]
+			writer.writerow([names[i], names[j], n_or, n_re] +
+					[ f"{val:.6g}" for val in values ])
+
+
+# MAIN FUNCTION
+def main():
+	names, aucs, pairs = compare_detectors(DETECTORS)
+
+	# Summary
+	print("AUC on each detector's own results:")
+	for name, auc in zip(names, aucs):
+		print(f"{name:>12}  AUC = {auc:0.3f}")
+	print()
+	print("Pairwise DeLong tests (on the texts each pair shares):")
+	print(f"{'':>12}{'':>12}{'n':>8}{'AUC a':>8}{'AUC b':>8}{'p':>10}")
+	for i, j, n_or, n_re, pair_aucs, _, pvalue in pairs:
+		print(f"{names[i]:>12}{names[j]:>12}{n_or + n_re:>8}"
+		      f"{pair_aucs[0]:>8.3f}{pair_aucs[1]:>8.3f}{pvalue:>10.4f}")
+
+	# Output
+	write_matrix(names, pvalue_matrix(len(names), pairs), PVALUES_FILE)
+	write_pairs(names, pairs, PAIRS_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+File: divergence.py
+Date created: 19 Oct 2026
+
+Description:
+Measures how well each detector separates original from modified
+abstracts, as numbers to go with the histograms of hist_tests.py: the
+Kolmogorov-Smirnov statistic, Wasserstein distance, Jensen-Shannon
+divergence (over JS_BINS bins) and Cohen's d between the OR and RE score
+distributions, each with a permutation-test p-value.
+
+All statistics are computed from the pooled scores sorted once, using
+cumulative counts of each label. Permutations are drawn as one label
+matrix (in blocks of PERM_ELEMENTS), so every permutation is evaluated
+at once. Detectors are ranked by RANK_BY and the table is written to
+DIVERGENCE_FILE, next to hists.svg.
+"""
+import csv
+import numpy as np
+
+import hist_tests
+import join_index
+
+
+# GLOBAL VARIABLE(s)
+DETECTORS = hist_tests.DETECTORS
+
+# Number of permutations for the p-values
+NUM_PERMUTATIONS = 10000
+
+# Most permutation labels held at once (bounds memory)
+PERM_ELEMENTS = 1 << 24
+
+# Number of bins for the Jensen-Shannon divergence (range is (0, 1))
+JS_BINS = 20
+
+# Pseudo-random number generator seed (for reproducibility)
+PRNG_SEED = 1
+
+# Statistic the detectors are ranked by (largest first)
+RANK_BY = "ks"
+
+# Output table
+DIVERGENCE_FILE = "divergence.csv"
+
+# Statistics, in table order
+STATISTICS = ["ks", "wasserstein", "js", "cohens_d"]
+
+
+"""
+Function:    divergence_stats
+Description: Computes every statistic for a batch of label arrangements
+             of the same pooled scores.
+Inputs:      Sorted array of n pooled scores, and a (P, n) array of labels
+             (1 = modified) in the order of the sorted scores. Every row
+             must have the same number of each label.
+Outputs:     Dictionary mapping statistic name to an array of P values.
+"""
+def divergence_stats(pooled, labels):
+	n = len(pooled)
+	num_re = labels[0].sum()
+	num_or = n - num_re
+
+	# Empirical CDFs of each label at every pooled score
+	cum_re = np.cumsum(labels, axis = 1, dtype = np.int64)
+	cum_or = np.arange(1, n + 1) - cum_re
+
+	# CDFs are only compared after the last of each group of tied scores
+	last = np.flatnonzero(np.append(pooled[1:] != pooled[:-1], True))
+	cdf_diff = cum_or[:, last] / num_or - cum_re[:, last] / num_re
+
+	ks = np.abs(cdf_diff).max(axis = 1)
+	wasserstein = np.abs(cdf_diff[:, :-1]) @ np.diff(pooled[last])
+
+	# Jensen-Shannon divergence (base 2) of the binned distributions,
+	# bins as np.histogram (last bin closed)
+	edges = np.searchsorted(pooled, np.linspace(0, 1, JS_BINS + 1), side = "left")
+	edges[-1] = n
+	padded_re = np.hstack((np.zeros((len(labels), 1), dtype = np.int64), cum_re))
+	bin_re = np.diff(padded_re[:, edges], axis = 1)
+	bin_or = np.diff(edges) - bin_re
+
+	p = bin_re / num_re
+	q = bin_or / num_or
+	mid = (p + q) / 2
+	with np.errstate(invalid = "ignore", divide = "ignore"):
+		kl_p = np.where(p > 0, p * np.log2(p / mid), 0.0).sum(axis = 1)
+		kl_q = np.where(q > 0, q * np.log2(q / mid), 0.0).sum(axis = 1)
+	js = (kl_p + kl_q) / 2
+
+	# Cohen's d (modified minus original, pooled standard deviation)
+	sum_re = labels @ pooled
+	sq_re = labels @ pooled ** 2
+	mean_re = sum_re / num_re
+	mean_or = (pooled.sum() - sum_re) / num_or
+	ss_re = sq_re - num_re * mean_re ** 2
+	ss_or = (pooled ** 2).sum() - sq_re - num_or * mean_or ** 2
+	with np.errstate(invalid = "ignore", divide = "ignore"):
+		cohens_d = (mean_re - mean_or) / np.sqrt((ss_re + ss_or) / (n - 2))
+
+	return {
+		"ks":          ks,
+		"wasserstein": wasserstein,
+		"js":          js,
+		"cohens_d":    cohens_d
+	}
+
+
+"""
+Function:    permutation_test
+Description: Computes the statistics of a detector and their permutation
+             p-values (the share of label permutations at least as
+             extreme; Cohen's d is two-sided).
+Inputs:      Arrays of labels and scores, number of permutations and a
+             NumPy Generator.
+Outputs:     Tuple of dictionaries (observed, pvalues).
+"""
+def permutation_test(labels, scores, num_perms, rng):
+	order = np.argsort(scores, kind = "stable")
+	pooled = scores[order].astype(float)
+	sorted_labels = labels[order].astype(np.int8)
+
+	observed = divergence_stats(pooled, sorted_labels[None, :])
+	extreme = { stat: 0 for stat in STATISTICS }
+
+	block = max(1, PERM_ELEMENTS // len(pooled))
+	for start in range(0, num_perms, block):
+		size = min(block, num_perms - start)
+		perms = rng.permuted(np.tile(sorted_labels, (size, 1)), axis = 1)
+		permuted = divergence_stats(pooled, perms)
+
+		for stat in STATISTICS:
+			if stat == "cohens_d":
+				hits = np.abs(permuted[stat]) >= np.abs(observed[stat][0]) - 1e-12
+			else:
+				hits = permuted[stat] >= observed[stat][0] - 1e-12
+			extreme[stat] += int(hits.sum())
+
+	observed = { stat: float(observed[stat][0]) for stat in STATISTICS }
+	pvalues = { stat: (1 + extreme[stat]) / (1 + num_perms) for stat in STATISTICS }
+	return observed, pvalues
+
+
+"""
+Function:    rank_detectors
+Description: Computes the statistics of every detector and ranks them.
+Inputs:      List of detector tuples (as in DETECTORS), number of
+             permutations and seed.
+Outputs:     List of tuples (label, n_or, n_re, observed, pvalues),
+             largest RANK_BY first.
+"""
+def rank_detectors(detectors, num_perms = NUM_PERMUTATIONS, seed = PRNG_SEED):
+	rng = np.random.default_rng(seed)
+
+	table = []
+	for detector in detectors:
+		_, labels, scores = join_index.retrieve_data(detector[0])
+		n_re = int(labels.sum())
+		n_or = len(labels) - n_re
+		if min(n_or, n_re) < 2:
+			print(f"{detector[1]}: needs at least two of each label, skipped")
+			continue
+
+		observed, pvalues = permutation_test(labels, scores, num_perms, rng)
+		table.append((detector[1], n_or, n_re, observed, pvalues))
+
+	table.sort(key = lambda row: row[3][RANK_BY], reverse = True)
+	return table
+
+
+"""
+Function:    write_table
+Description: Writes the ranked table to a csv file.
+Inputs:      Ranked table (as from rank_detectors) and output filename.
+Outputs:     None
+"""
+def write_table(table, filename):
+	with open(filename, "w+") as outfile:
+		writer = csv.writer(outfile)
+
+		# Write headings
+		headings = ["rank", "detector", "n_original", "n_modified"]
+		for stat in STATISTICS:
+			headings += [stat, stat + "_p"]
+		writer.writerow(headings)
+
+		# Write rows
+		for rank, (label, n_or, n_re, observed, pvalues) in enumerate(table, 1):
+			row = [rank, label, n_or, n_re]
+			for stat in STATISTICS:
+				row += [f"{observed[stat]:.6g}", f"{pvalues[stat]:.6g}"]
+			writer.writerow(row)
+
+
+# MAIN FUNCTION
+def main():
+	table = rank_detectors(DETECTORS)
+
+	# Summary
+	print(f"{'':>4}{'detector':>12}" + "".join(f"{stat:>13}{'p':>8}" for stat in STATISTICS))
+	for rank, (label, _, _, observed, pvalues) in enumerate(table, 1):
+		print(f"{rank:>4}{label:>12}" +
+		      "".join(f"{observed[stat]:>13.3f}{pvalues[stat]:>8.4f}" for stat in STATISTICS))
+
+	write_table(table, DIVERGENCE_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+File: ensemble.py
+Date created: 19 Oct 2026
+
+Description:
+Combines the detectors into ensembles (mean, max, rank-average and
+learned weights), to find out whether combining services beats any
+single one. Scores are computed in one pass over the aligned score
+matrix from join_index.py, written as pseudo-detector test csv files
+and evaluated through the existing ROC and TPR/FPR plots.
+"""
+import csv
+import os
+import matplotlib.pyplot as plt
+import numpy as np
+from scipy import stats
+from sklearn import linear_model
+from sklearn import model_selection
+
+import join_index
+import roc_test
+import tpr_fpr_tests
+
+
+# GLOBAL VARIABLE(s)
+# List of tuples, with the form (filename, plot_label)
+DETECTORS = roc_test.DETECTORS
+
+# Folder for the pseudo-detector test csv files
+ENSEMBLE_DIR = "data/ensembles"
+
+# Subplot location of each ensemble in the TPR/FPR figure
+ENSEMBLE_LOCS = {
+	"Mean":         (0, 0),
+	"Max":          (0, 1),
+	"Rank-average": (1, 0),
+	"Learned":      (1, 1)
+}
+
+# Number of cross-validation folds for the learned weights
+CV_FOLDS = 5
+
+# Pseudo-random number generator seed (for reproducibility)
+PRNG_SEED = 1
+
+
+"""
+Function:    rank_normalise
+Description: Replaces each detector's scores with their rank among that
+             detector's results, scaled to (0, 1), so detectors with
+             different score distributions are comparable.
+Inputs:      (n, k) score matrix and (n, k) mask of present values.
+Outputs:     (n, k) matrix of normalised ranks (nan where missing).
+"""
+def rank_normalise(scores, mask):
+	# Missing values are ranked last, so present ranks are unaffected
+	ranks = stats.rankdata(np.where(mask, scores, np.inf), axis = 0)
+	counts = mask.sum(axis = 0)
+
+	with np.errstate(invalid = "ignore", divide = "ignore"):
+		normalised = (ranks - 0.5) / counts
+
+	return np.where(mask, normalised, np.nan)
+
+
+"""
+Function:    learned_scores
+Description: Fits logistic regression weights over the normalised
+             detector ranks (missing results count as 0.5), and gives
+             out-of-fold probabilities so no text is scored by a model
+             trained on it.
+Inputs:      (n, k) normalised rank matrix and n labels.
+Outputs:     Array of n probabilities.
+"""
+def learned_scores(ranks, labels):
+	features = np.where(np.isnan(ranks), 0.5, ranks)
+
+	folds = min(CV_FOLDS, np.bincount(labels).min())
+	if folds < 2:
+		return np.full(len(labels), np.nan)
+
+	model = linear_model.LogisticRegression()
+	splitter = model_selection.StratifiedKFold(n_splits = folds,
+						   shuffle = True,
+						   random_state = PRNG_SEED)
+
+	probabilities = model_selection.cross_val_predict(model,
+							  features,
+							  labels,
+							  cv = splitter,
+							  method = "predict_proba")
+	return probabilities[:, 1]
+
+
+"""
+Function:    ensemble_scores
+Description: Computes every ensemble strategy over the aligned score
+             matrix, using only the detectors present for each text.
+Inputs:      (n, k) score matrix, (n, k) mask and n labels.
+Outputs:     Dictionary mapping ensemble name to an array of n scores.
+"""
+def ensemble_scores(scores, mask, labels):
+	ranks = rank_normalise(scores, mask)
+
+	return {
+		"Mean":         np.nanmean(scores, axis = 1),
+		"Max":          np.nanmax(scores, axis = 1),
+		"Rank-average": np.nanmean(ranks, axis = 1),
+		"Learned":      learned_scores(ranks, labels)
+	}
+
+
+"""
+Function:    write_ensemble_csv
+Description: Writes ensemble scores in the same format as the detector
+             test csv files (generated with gen_tests_csv.py), so the
+             visualisation scripts can read them as pseudo-detectors.
+Inputs:      Array of keys, array of labels, array of scores and the
+             output filename.
+Outputs:     None
+"""
+def write_ensemble_csv(keys, labels, scores, out_filename):
+	dois = join_index.key_doi(keys)
+
+	with open(out_filename, "w+") as outfile:
+		writer = csv.writer(outfile)
+
+		# Write headings
+		writer.writerow(["doi", "pub_date", "text",
+				 "is_rewritten",
+				 "detection probability"])
+
+		# Write rows (pub_date and text are not needed for analysis)
+		for doi, label, score in zip(dois, labels, scores):
+			if not np.isnan(score):
+				writer.writerow([doi, "", "", label, f"{score:.6g}"])
+
+
+# MAIN FUNCTION
+def main():
+	keys, labels, scores, mask = join_index.build_index(DETECTORS)
+	ensembles = ensemble_scores(scores, mask, labels)
+
+	# Write pseudo-detectors
+	os.makedirs(ENSEMBLE_DIR, exist_ok = True)
+	pseudo_detectors = []
+	for name, ensemble in ensembles.items():
+		filename = os.path.join(ENSEMBLE_DIR, name + "_tests.csv")
+		write_ensemble_csv(keys, labels, ensemble, filename)
+		pseudo_detectors.append((filename, name + " (ensemble)", ENSEMBLE_LOCS[name]))
+
+	# ROC of detectors and ensembles together
+	fig, main_ax = plt.subplots()
+	main_ax.set_title("Receiver Operating Characteristic (ROC) curves")
+	main_ax.grid(linestyle="--")
+
+	for detector in DETECTORS:
+		roc_test.draw_ROC(detector[0], main_ax, detector[1])
+	for detector in pseudo_detectors:
+		roc_test.draw_ROC(detector[0], main_ax, detector[1])
+
+	plt.savefig("ensemble_ROC.svg")
+	plt.savefig("ensemble_ROC.png")
+
+	# TPR/FPR of ensembles
+	fig, main_axes = plt.subplots(nrows = tpr_fpr_tests.NROWS,
+				      ncols = tpr_fpr_tests.NCOLS)
+	fig.suptitle(
+		"True Positive Rate and False Positive Rate\nof Detector Ensembles",
+		x  = 0.05,
+		y  = 0.97,
+		ha = "left",
+	)
+
+	for detector in pseudo_detectors:
+		thresh_arr, tpr_arr, fpr_arr = tpr_fpr_tests.compute_rates(detector[0])
+		tpr_fpr_tests.plot_rate_curve(thresh_arr, tpr_arr, detector, main_axes,
+					      "True Positive Rate", tpr_fpr_tests.TPR_COLOUR)
+		tpr_fpr_tests.plot_rate_curve(thresh_arr, fpr_arr, detector, main_axes,
+					      "False Positive Rate", tpr_fpr_tests.FPR_COLOUR)
+
+	handles, labels = plt.gca().get_legend_handles_labels()
+	fig.legend(handles, labels, loc = "upper right", bbox_to_anchor = (0.97, 1.0))
+	fig.tight_layout()
+
+	plt.savefig("ensemble_tpr_fpr.svg")
+	plt.savefig("ensemble_tpr_fpr.png")
+	plt.show()
+
+
+if __name__ == "__main__":
+    main()
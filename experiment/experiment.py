@@ -0,0 +1,428 @@
+"""
+File: experiment.py
+Date created: 19 Oct 2026
+
+Description:
+Runs the experiment pipeline (see README.txt) as a dependency graph of
+stages. Each stage's inputs (database rows, csv files, script source and
+config constants such as NUM_TESTS, BINS and POINT_RES) are hashed, and
+a stage is only rerun when that hash has changed since its last
+successful run. Independent stages are run concurrently.
+
+The per-detector work (ROC curve, TPR/FPR rates, histogram counts) is
+cached in STATE_DIR, so when one detector's test csv changes only that
+detector is recomputed and the figures are redrawn from the cache.
+
+Usage:       python experiment.py [--force] [--dry-run] [--jobs N] [stage ...]
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import importlib
+import json
+import os
+import sqlite3
+import sys
+import traceback
+import matplotlib
+import numpy as np
+
+# Figures are only saved, never shown
+matplotlib.use("Agg")
+
+import hist_tests
+import roc_test
+import tpr_fpr_tests
+
+
+# GLOBAL VARIABLE(s)
+DB_FILE = "abstract_db.sqlite"
+
+# Folder holding the stage state and the per-detector cache
+STATE_DIR = ".experiment"
+STATE_FILE = os.path.join(STATE_DIR, "state.json")
+CACHE_DIR = os.path.join(STATE_DIR, "cache")
+
+# Default number of stages run at once
+JOBS = os.cpu_count() or 1
+
+# Size of chunks read when hashing files
+HASH_CHUNK = 1 << 20
+
+
+"""
+Function:    stage
+Description: Creates a stage of the pipeline.
+Inputs:      Stage name, action tuple (function, args), and optionally the
+             names of stages it depends on, csv/data files, database
+             queries, config constants as (module, [names]), script files
+             and output files.
+Outputs:     Dictionary describing the stage.
+"""
+def stage(name, action, deps = (), files = (), db = (), config = (),
+          code = (), outputs = ()):
+	return {
+		"name":    name,
+		"action":  action,
+		"deps":    list(deps),
+		"files":   list(files),
+		"db":      list(db),
+		"config":  list(config),
+		"code":    list(code),
+		"outputs": list(outputs)
+	}
+
+
+"""
+Function:    cache_path
+Description: Gives the cache filename for a per-detector stage.
+Inputs:      Stage name.
+Outputs:     Path of the cache file.
+"""
+def cache_path(name):
+	return os.path.join(CACHE_DIR, name.replace(":", "_") + ".npz")
+
+
+"""
+Function:    build_stages
+Description: Describes the whole pipeline.
+Inputs:      None
+Outputs:     List of stages (as from stage()).
+"""
+def build_stages():
+	stages = []
+
+	# 1. Prompts for GPT 4o-mini
+	stages.append(stage("prompts",
+		(run_main, ("gen_prompts",)),
+		db      = ["SELECT doi, pub_date, og_text FROM abstracts"],
+		config  = [("gen_prompts", ["PROMPTS_FILENAME"])],
+		code    = ["gen_prompts.py", "text_store.py"],
+		outputs = ["prompts.txt"]))
+
+	# 2. Test files (to be moved into "data" and filled in by hand)
+	stages.append(stage("tests_csv",
+		(run_main, ("gen_tests_csv",)),
+		db      = ["SELECT doi, pub_date, og_text, rep_text FROM abstracts"],
+		config  = [("gen_tests_csv", ["NUM_TESTS", "OUT_FILE"])],
+		code    = ["gen_tests_csv.py", "text_store.py"],
+		outputs = ["test_abstracts.csv"]))
+
+	# 4. Visualisation, one compute stage per detector and a figure stage.
+	# Figures are drawn from the cached results, so each figure stage only
+	# depends on the settings its own drawing code reads
+	per_detector = [
+		("roc",   roc_test,      "compute_ROC",   "ROC",
+		 [("decimate", ["PIXEL_BUDGET", "COLLINEAR_TOL"])],
+		 ["roc_test.py", "decimate.py"],
+		 [], ["roc_test.py"]),
+		("rates", tpr_fpr_tests, "compute_rates", "tpr_fpr",
+		 [("tpr_fpr_tests", ["POINT_RES"])],
+		 ["tpr_fpr_tests.py"],
+		 [("tpr_fpr_tests", ["NROWS", "NCOLS"])], ["tpr_fpr_tests.py"]),
+		("hist",  hist_tests,    "compute_hists", "hists",
+		 [("hist_tests", ["BINS"])],
+		 ["hist_tests.py"],
+		 [("hist_tests", ["NROWS", "NCOLS"])], ["hist_tests.py"])
+	]
+	for prefix, module, func_name, figure, config, code, figure_config, figure_code in per_detector:
+		items = []
+		for detector in module.DETECTORS:
+			name = prefix + ":" + detector[1]
+			stages.append(stage(name,
+				(cache_result, (module.__name__, func_name, detector[0], cache_path(name))),
+				files   = [detector[0]],
+				config  = config,
+				code    = code,
+				outputs = [cache_path(name)]))
+			items.append((detector, cache_path(name)))
+
+		stages.append(stage(figure,
+			(draw_cached_figure, (module.__name__, items)),
+			deps    = [ prefix + ":" + detector[1] for detector in module.DETECTORS ],
+			files   = [ path for _, path in items ],
+			config  = figure_config,
+			code    = figure_code,
+			outputs = [figure + ".svg", figure + ".png"]))
+
+	# 5. Statistics
+	test_files = [ detector[0] for detector in roc_test.DETECTORS ]
+	stages.append(stage("delong",
+		(run_main, ("delong",)),
+		files   = test_files,
+		code    = ["delong.py", "join_index.py"],
+		outputs = ["delong_pvalues.csv", "delong_pairs.csv"]))
+	stages.append(stage("ensemble",
+		(run_main, ("ensemble",)),
+		files   = test_files,
+		config  = [("ensemble", ["CV_FOLDS", "PRNG_SEED"]),
+			   ("tpr_fpr_tests", ["POINT_RES"]),
+			   ("decimate", ["PIXEL_BUDGET", "COLLINEAR_TOL"])],
+		code    = ["ensemble.py", "join_index.py", "roc_test.py",
+			   "tpr_fpr_tests.py", "decimate.py"],
+		outputs = ["ensemble_ROC.svg", "ensemble_tpr_fpr.svg"]))
+	stages.append(stage("divergence",
+		(run_main, ("divergence",)),
+		files   = [ detector[0] for detector in hist_tests.DETECTORS ],
+		config  = [("divergence", ["NUM_PERMUTATIONS", "JS_BINS", "PRNG_SEED", "RANK_BY"])],
+		code    = ["divergence.py", "join_index.py"],
+		outputs = ["divergence.csv"]))
+
+	return stages
+
+
+# STAGE ACTIONS (run in worker processes)
+
+"""
+Function:    run_main
+Description: Runs the main function of one of the pipeline scripts.
+Inputs:      Module name.
+Outputs:     None
+"""
+def run_main(module_name):
+	importlib.import_module(module_name).main()
+
+
+"""
+Function:    cache_result
+Description: Runs a per-detector compute function and saves its result.
+Inputs:      Module name, function name, test csv filename and cache
+             filename.
+Outputs:     None
+"""
+def cache_result(module_name, func_name, filename, out_path):
+	func = getattr(importlib.import_module(module_name), func_name)
+	np.savez(out_path, *func(filename))
+
+
+"""
+Function:    draw_cached_figure
+Description: Draws a script's figure from the cached per-detector results.
+Inputs:      Module name, list of tuples (detector, cache filename).
+Outputs:     None
+"""
+def draw_cached_figure(module_name, items):
+	results = []
+	for detector, path in items:
+		with np.load(path) as cached:
+			result = tuple( cached[f"arr_{i}"] for i in range(len(cached.files)) )
+		results.append((detector, result))
+
+	importlib.import_module(module_name).draw_figure(results)
+
+
+# HASHING
+
+"""
+Function:    hash_file
+Description: Hashes the content of a file.
+Inputs:      Filename.
+Outputs:     Hex digest ("missing" if the file does not exist).
+"""
+def hash_file(filename):
+	if not os.path.exists(filename):
+		return "missing"
+
+	digest = hashlib.sha256()
+	with open(filename, "rb") as infile:
+		for chunk in iter(lambda: infile.read(HASH_CHUNK), b""):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+"""
+Function:    hash_query
+Description: Hashes the rows returned by a database query (so changes to
+             unrelated columns or tables do not invalidate a stage).
+Inputs:      Database filename and SQL query.
+Outputs:     Hex digest ("missing" if the database does not exist).
+"""
+def hash_query(db_filename, query):
+	if not os.path.exists(db_filename):
+		return "missing"
+
+	digest = hashlib.sha256()
+	connection = sqlite3.connect(db_filename)
+	for row in connection.execute(query):
+		digest.update(repr(row).encode())
+	connection.close()
+	return digest.hexdigest()
+
+
+"""
+Function:    stage_key
+Description: Hashes every input of a stage.
+Inputs:      Stage (as from stage()).
+Outputs:     Hex digest.
+"""
+def stage_key(st):
+	config = {}
+	for module_name, names in st["config"]:
+		module = importlib.import_module(module_name)
+		for name in names:
+			config[module_name + "." + name] = repr(getattr(module, name))
+
+	inputs = {
+		"action": [st["action"][0].__name__, repr(st["action"][1])],
+		"files":  { filename: hash_file(filename) for filename in st["files"] },
+		"db":     { query: hash_query(DB_FILE, query) for query in st["db"] },
+		"config": config,
+		"code":   { filename: hash_file(filename) for filename in st["code"] }
+	}
+	return hashlib.sha256(json.dumps(inputs, sort_keys = True).encode()).hexdigest()
+
+
+"""
+Function:    load_state
+Description: Reads the stage keys from the last successful runs.
+Inputs:      None
+Outputs:     Dictionary mapping stage name to key.
+"""
+def load_state():
+	if not os.path.exists(STATE_FILE):
+		return {}
+	with open(STATE_FILE, "r") as infile:
+		return json.load(infile)
+
+
+"""
+Function:    save_state
+Description: Writes the stage keys (atomically, so an interrupted run
+             never leaves a corrupt state file).
+Inputs:      Dictionary mapping stage name to key.
+Outputs:     None
+"""
+def save_state(state):
+	tmp_file = STATE_FILE + ".tmp"
+	with open(tmp_file, "w+") as outfile:
+		json.dump(state, outfile, indent = 1, sort_keys = True)
+	os.replace(tmp_file, STATE_FILE)
+
+
+# SCHEDULER
+
+"""
+Function:    select_stages
+Description: Selects the requested stages and everything they depend on.
+Inputs:      List of all stages, list of requested names or prefixes
+             (e.g. "roc" selects "roc:GPTZero" etc.); empty for all.
+Outputs:     Dictionary mapping stage name to stage.
+"""
+def select_stages(stages, requested):
+	by_name = { st["name"]: st for st in stages }
+	if not requested:
+		return by_name
+
+	selected = {}
+	todo = [ name for name in by_name
+		 if any(name == req or name.startswith(req + ":") for req in requested) ]
+	if not todo:
+		raise SystemExit("error: no stage matches " + ", ".join(requested))
+
+	while todo:
+		name = todo.pop()
+		if name not in selected:
+			selected[name] = by_name[name]
+			todo.extend(by_name[name]["deps"])
+	return selected
+
+
+"""
+Function:    run
+Description: Runs the selected stages in dependency order, skipping stages
+             whose inputs are unchanged and running independent stages
+             concurrently.
+Inputs:      Dictionary of stages (as from select_stages), number of
+             worker processes, whether to ignore the saved state and
+             whether to only report what would run.
+Outputs:     True if every stage succeeded (or was up to date).
+"""
+def run(stages, jobs = JOBS, force = False, dry_run = False):
+	state   = load_state()
+	pending = dict(stages)
+	done    = set()     # finished (run or skipped)
+	changed = set()     # would run (dry run only)
+	failed  = set()
+	running = {}
+
+	with concurrent.futures.ProcessPoolExecutor(max_workers = jobs) as pool:
+		while pending or running:
+			# Start every stage whose dependencies are finished
+			for name, st in list(pending.items()):
+				if any(dep in failed for dep in st["deps"]):
+					print(f"[skip]  {name} (dependency failed)")
+					failed.add(name)
+					del pending[name]
+					continue
+				if not all(dep in done for dep in st["deps"]):
+					continue
+
+				del pending[name]
+
+				if dry_run and any(dep in changed for dep in st["deps"]):
+					print(f"[run]   {name}")
+					changed.add(name)
+					done.add(name)
+					continue
+
+				key = stage_key(st)
+				outputs_exist = all(os.path.exists(out) for out in st["outputs"])
+				if not force and state.get(name) == key and outputs_exist:
+					print(f"[ok]    {name}")
+					done.add(name)
+				elif dry_run:
+					print(f"[run]   {name}")
+					changed.add(name)
+					done.add(name)
+				else:
+					func, args = st["action"]
+					running[pool.submit(func, *args)] = (name, key)
+
+			if not running:
+				continue
+
+			# Wait for any running stage to finish
+			finished, _ = concurrent.futures.wait(running,
+				return_when = concurrent.futures.FIRST_COMPLETED)
+			for future in finished:
+				name, key = running.pop(future)
+				try:
+					future.result()
+				except Exception:
+					print(f"[fail]  {name}")
+					traceback.print_exc()
+					failed.add(name)
+					state.pop(name, None)
+				else:
+					print(f"[done]  {name}")
+					done.add(name)
+					state[name] = key
+				save_state(state)
+
+	return not failed
+
+
+# MAIN FUNCTION
+def main():
+	parser = argparse.ArgumentParser(description = "Run the experiment pipeline.")
+	parser.add_argument("stages", nargs = "*",
+			    help = "stages (or stage prefixes) to run, default all")
+	parser.add_argument("--force", action = "store_true",
+			    help = "rerun stages even if their inputs are unchanged")
+	parser.add_argument("--dry-run", action = "store_true",
+			    help = "only report which stages would run")
+	parser.add_argument("--jobs", type = int, default = JOBS,
+			    help = "number of stages run at once")
+	args = parser.parse_args()
+
+	os.makedirs(CACHE_DIR, exist_ok = True)
+
+	stages = select_stages(build_stages(), args.stages)
+	ok = run(stages, jobs = args.jobs, force = args.force, dry_run = args.dry_run)
+	sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    # Scripts use paths relative to the experiment folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -7,9 +7,10 @@ Description:
 Outputs a file telling the experimenters what prompts
 to enter into ChatGPT (GPT 4o-mini).
 """
-import sqlite3
 import csv
 
+import text_store
+
 
 # GLOBAL VARIABLES(s)
 DB_FILENAME = "abstract_db.sqlite"
@@ -25,17 +26,9 @@ Outputs:     List of tuples containing table data (doi, pub_date,
              og_text)
 """
 def retrieve_data(db_filename):
-	# Open DB
-	connection = sqlite3.connect(db_filename)
-	cursor = connection.cursor()
-
-	# Get data
-	cursor.execute("SELECT doi, pub_date, og_text \
+	# Get data (abstract text is decompressed when it is read)
+	data = text_store.fetch_rows(db_filename, "SELECT doi, pub_date, og_text \
 		        FROM abstracts")
-	data = cursor.fetchall()
-
-	# Close DB
-	connection.close()
 
 	return data
 
@@ -74,13 +67,13 @@ Outputs:     None
 """
 def write_prompts(outlist, filename):
 	with open(filename, "w+") as outfile:   # Write to TXT file
-	for prompt in outlist:
-		outfile.write(prompt[0] + ", " +
-		              prompt[1] + "\n")  # doi, pub_date (for readability)
+		for prompt in outlist:
+			outfile.write(prompt[0] + ", " +
+			              prompt[1] + "\n")  # doi, pub_date (for readability)
 
-		outfile.write(prompt[2] + "\n")  # prompt to be copied to ChatGPT
+			outfile.write(prompt[2] + "\n")  # prompt to be copied to ChatGPT
 
-		outfile.write("\n\n")            # extra spacing (for readability)
+			outfile.write("\n\n")            # extra spacing (for readability)
 """     # For csv writing instead of txt
 	with open("prompts.csv", "w+") as outfile:   # Write to CSV file
 	writer = csv.writer(outfile)
@@ -11,9 +11,10 @@ alongside whether it was rewritten or original.
 gen_tests.py is now deprecated and gen_tests_csv.py
 should be used instead.
 """
-import sqlite3
 import random
 
+import text_store
+
 
 # GLOBAL VARIABLE(s)
 NUM_TESTS = 25
@@ -58,17 +59,9 @@ Outputs:     List of tuples containing table data (doi, pub_date,
              og_text, rep_text)
 """
 def retrieve_data(db_filename):
-	# Open DB
-	connection = sqlite3.connect(db_filename)
-	cursor = connection.cursor()
-
-	# Get data
-	cursor.execute("SELECT doi, pub_date, og_text, rep_text \
+	# Get data (abstract text is decompressed when it is read)
+	data = text_store.fetch_rows(db_filename, "SELECT doi, pub_date, og_text, rep_text \
 		        FROM abstracts")
-	data = cursor.fetchall()
-
-	# Close DB
-	connection.close()
 
 	return data
 
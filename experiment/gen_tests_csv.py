@@ -9,10 +9,11 @@ abstracts to enter into a detection service,
 alongside whether it was rewritten or original and
 the results of those detectors acting on the abstracts.
 """
-import sqlite3
 import random
 import csv
 
+import text_store
+
 
 # GLOBAL VARIABLE(s)
 NUM_TESTS = 25
@@ -51,35 +52,46 @@ def test_indices(in_size, num_s, seed = 1):
 """
 Function: retrieve_data
 Description: Opens the experiment database and gives the fields
-             doi, pub_date, og_text, rep_text
+             rowid, doi, pub_date (abstract text is read separately,
+             for the chosen abstracts only)
 Inputs:      Name of file which contains the aforementioned data.
-Outputs:     List of tuples containing table data (doi, pub_date,
-             og_text, rep_text)
+Outputs:     List of tuples containing table data (rowid, doi,
+             pub_date)
 """
 def retrieve_data(db_filename):
-	# Open DB
-	connection = sqlite3.connect(db_filename)
-	cursor = connection.cursor()
-
 	# Get data
-	cursor.execute("SELECT doi, pub_date, og_text, rep_text \
-		        FROM abstracts")
-	data = cursor.fetchall()
-
-	# Close DB
-	connection.close()
+	data = text_store.fetch_rows(db_filename, "SELECT rowid, doi, pub_date \
+		        FROM abstracts ORDER BY rowid")
 
 	return data
 
+
+"""
+Function: retrieve_texts
+Description: Opens the experiment database and gives the fields
+             og_text, rep_text of the chosen abstracts
+Inputs:      Name of file which contains the aforementioned data,
+             and list of rowids (as from retrieve_data).
+Outputs:     Dictionary mapping rowid to a tuple (og_text, rep_text)
+"""
+def retrieve_texts(db_filename, rowids):
+	# Get data (abstract text is decompressed when it is read)
+	params = ", ".join("?" * len(rowids))
+	data = text_store.fetch_rows(db_filename, f"SELECT rowid, og_text, rep_text \
+		        FROM abstracts WHERE rowid IN ({params})", tuple(rowids))
+
+	return { row[0]: row[1:] for row in data }
+
 """
 Function:    gen_tests_csv
 Description: Creates and writes to a file with the abstracts
              alongside the article doi and whether it was modified.
 Inputs:      Abstracts data structure to be filtered and outputted,
-             name of file which contains the aforementioned data.
+             texts of the chosen abstracts (as from retrieve_texts),
+             list of chosen indices and name of the output file.
 Outputs:     None
 """
-def gen_tests_csv(abstracts_data, index_list, out_filename):
+def gen_tests_csv(abstracts_data, texts, index_list, out_filename):
 	with open(out_filename, "w+") as outfile:   # Write to TXT file
 		writer = csv.writer(outfile)
 
@@ -96,10 +108,10 @@ def gen_tests_csv(abstracts_data, index_list, out_filename):
 
 			# Get chosen article's data
 			article  = abstracts_data[i]
-			doi      = article[0]
-			pub_date = article[1]
-			og_text  = article[2]
-			rep_text = article[3]
+			doi      = article[1]
+			pub_date = article[2]
+			og_text  = texts[article[0]][0]
+			rep_text = texts[article[0]][1]
 
 			# Create row handler
 			temp_row = [doi, pub_date, "", 0, 0]
@@ -122,7 +134,8 @@ def gen_tests_csv(abstracts_data, index_list, out_filename):
 def main():
 	abstracts = retrieve_data(DB_FILE)
 	indices = test_indices(len(abstracts), NUM_TESTS)
-	gen_tests_csv(abstracts, indices, OUT_FILE)
+	texts = retrieve_texts(DB_FILE, [ abstracts[i][0] for i, _ in indices ])
+	gen_tests_csv(abstracts, texts, indices, OUT_FILE)
 
 
 if __name__ == "__main__":
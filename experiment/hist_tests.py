@@ -67,25 +67,14 @@ def retrieve_data(filename):
 
 
 """
-Function:    draw_hists
-Description: Gets a list of tuples containing results from an experiment and
-	     plots two histograms of the detector's responses. The two
-	     histogram classes include one for original abstracts and another
-	     for modified abstracts.
-Inputs:      The filename containing the experiment data
-	     List of tuples containing results for a detector, the target
-	     axis for PyPlot and the filename of the test csv.
-Outputs:     None
+Function:    compute_hists
+Description: Gets a test csv containing results from an experiment and
+	     counts the detector's responses into BINS bins over (0, 1), for
+	     original abstracts and for modified abstracts.
+Inputs:      The filename containing the experiment data.
+Outputs:     Tuple of arrays (edges, ori_counts, mod_counts).
 """
-def draw_hists(detector, target_axes):
-	# Local variable definition
-	filename      = detector[0]
-	subplt_title  = detector[1]
-	subplt_loc    = detector[2]
-	subplt_x      = subplt_loc[0]
-	subplt_y      = subplt_loc[1]
-	subplt_colour = detector[3]
-
+def compute_hists(filename):
 	# Load file
 	exp_result = retrieve_data(filename)
 
@@ -95,25 +84,48 @@ def draw_hists(detector, target_axes):
 	# Get all results for modified abstracts (is_rewritten == 1)
 	mod_abs = [ float(datum[1]) for datum in exp_result if (int(datum[0]) == 1) ]
 
-	# Plot histograms
+	# Count
+	ori_counts, edges = np.histogram(ori_abs, bins = BINS, range = (0, 1))
+	mod_counts, edges = np.histogram(mod_abs, bins = BINS, range = (0, 1))
+
+	return edges, ori_counts, mod_counts
+
+
+"""
+Function:    plot_hists
+Description: Plots two (counted) histograms of a detector's responses, one
+	     for original abstracts and another for modified abstracts.
+Inputs:      Tuple (edges, ori_counts, mod_counts) as from compute_hists,
+	     the detector tuple (as in DETECTORS) and the target axes for PyPlot.
+Outputs:     None
+"""
+def plot_hists(hists, detector, target_axes):
+	# Local variable definition
+	subplt_title  = detector[1]
+	subplt_loc    = detector[2]
+	subplt_x      = subplt_loc[0]
+	subplt_y      = subplt_loc[1]
+	edges, ori_counts, mod_counts = hists
+
+	# Plot histograms (one weighted sample per bin)
 
 	# Original abstracts histogram
 	target_axes[subplt_x, subplt_y].hist(
-		ori_abs,
-		bins  = BINS,
-		range = (0, 1),
-		label = "Original Abstracts",
-		color = ORI_COLOUR,
-		alpha = 0.50
+		edges[:-1],
+		bins    = edges,
+		weights = ori_counts,
+		label   = "Original Abstracts",
+		color   = ORI_COLOUR,
+		alpha   = 0.50
 	)
 	# Modified abstracts histogram
 	target_axes[subplt_x, subplt_y].hist(
-		mod_abs,
-		bins  = BINS,
-		range = (0, 1),
-		label = "Modified Abstracts",
-		color = MOD_COLOUR,
-		alpha = 0.50
+		edges[:-1],
+		bins    = edges,
+		weights = mod_counts,
+		label   = "Modified Abstracts",
+		color   = MOD_COLOUR,
+		alpha   = 0.50
 	)
 
 	# Appearance configuration
@@ -123,8 +135,29 @@ def draw_hists(detector, target_axes):
 	target_axes[subplt_x, subplt_y].set_title(subplt_title)
 
 
-# MAIN FUNCTION
-def main():
+"""
+Function:    draw_hists
+Description: Gets a list of tuples containing results from an experiment and
+	     plots two histograms of the detector's responses. The two
+	     histogram classes include one for original abstracts and another
+	     for modified abstracts.
+Inputs:      The filename containing the experiment data
+	     List of tuples containing results for a detector, the target
+	     axis for PyPlot and the filename of the test csv.
+Outputs:     None
+"""
+def draw_hists(detector, target_axes):
+	plot_hists(compute_hists(detector[0]), detector, target_axes)
+
+
+"""
+Function:    draw_figure
+Description: Draws and saves the histogram figure for all detectors.
+Inputs:      List of tuples, with the form (detector, hists), where
+	     detector is as in DETECTORS and hists is as from compute_hists.
+Outputs:     None
+"""
+def draw_figure(all_hists):
 	# Create PyPlot objects
 	fig, main_axes = plt.subplots(nrows = NROWS, ncols = NCOLS)
 	fig.suptitle(
@@ -134,9 +167,9 @@ def main():
 		ha = "left",
 	)
 
-	# Draw ROC for each detector
-	for detector in DETECTORS:
-		draw_hists(detector, main_axes)
+	# Draw histograms for each detector
+	for detector, hists in all_hists:
+		plot_hists(hists, detector, main_axes)
 
 	# Create legend
 	handles, labels = plt.gca().get_legend_handles_labels()
@@ -148,6 +181,12 @@ def main():
 	# Render
 	plt.savefig("hists.svg")
 	plt.savefig("hists.png")
+
+
+# MAIN FUNCTION
+def main():
+	all_hists = [ (detector, compute_hists(detector[0])) for detector in DETECTORS ]
+	draw_figure(all_hists)
 	plt.show()
 
 
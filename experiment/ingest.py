@@ -0,0 +1,295 @@
+"""
+File: ingest.py
+Date created: 19 Oct 2026
+
+Description:
+Loads abstracts into the experiment database from JSONL or CSV dumps
+with the fields doi, pub_date and og_text. Rows are inserted in batches
+(executemany) inside large transactions, abstracts already in the
+database (same doi) are skipped, and any secondary indexes listed in
+INDEXES are only built once loading has finished (the schema currently
+has none). If the database stores compressed text (see
+text_store.py), og_text is compressed as it is loaded.
+
+The byte offset reached in each dump is saved in the same transaction
+as the rows, so an interrupted load continues where it stopped when the
+command is run again.
+
+Usage:       python ingest.py [--update] [--restart] <dump> [<dump> ...]
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import text_store
+
+
+# GLOBAL VARIABLE(s)
+DB_FILE = "abstract_db.sqlite"
+
+# Rows per executemany call, and rows per transaction
+BATCH_ROWS = 10000
+COMMIT_ROWS = 200000
+
+# Fields read from each record
+FIELDS = ("doi", "pub_date", "og_text")
+
+# Same schema as the existing abstracts table
+CREATE_TABLE = """CREATE TABLE IF NOT EXISTS "abstracts" (
+	"doi"	VARCHAR UNIQUE,
+	"pub_date"	TEXT,
+	"og_text"	VARCHAR,
+	"rep_text"	VARCHAR,
+	"rep_tokens"	INTEGER DEFAULT 0,
+	"changed_tokens"	INTEGER DEFAULT 0,
+	PRIMARY KEY("doi")
+)"""
+
+CREATE_PROGRESS = """CREATE TABLE IF NOT EXISTS "ingest_progress" (
+	"source"	TEXT PRIMARY KEY,
+	"size"	INTEGER,
+	"offset"	INTEGER,
+	"rows"	INTEGER
+)"""
+
+# Secondary indexes (name, definition), dropped while loading and built
+# after a successful load (none in the existing schema; the doi index is
+# needed while loading)
+INDEXES = []
+
+INSERT_IGNORE = """INSERT INTO abstracts (doi, pub_date, og_text) VALUES (?, ?, ?)
+	ON CONFLICT(doi) DO NOTHING"""
+
+# The rewrite of an abstract (and its token counts) no longer belongs to
+# it once the original text changes, so it is cleared
+INSERT_UPDATE = """INSERT INTO abstracts (doi, pub_date, og_text) VALUES (?, ?, ?)
+	ON CONFLICT(doi) DO UPDATE SET
+		pub_date       = excluded.pub_date,
+		rep_text       = CASE WHEN og_text IS excluded.og_text THEN rep_text ELSE NULL END,
+		rep_tokens     = CASE WHEN og_text IS excluded.og_text THEN rep_tokens ELSE 0 END,
+		changed_tokens = CASE WHEN og_text IS excluded.og_text THEN changed_tokens ELSE 0 END,
+		og_text        = excluded.og_text"""
+
+
+"""
+Function:    read_lines
+Description: Reads a dump line by line from a byte offset, keeping track
+             of the offset after each line.
+Inputs:      Open binary file, and a one-element list which is updated
+             with the current offset.
+Outputs:     Generator of decoded lines.
+"""
+def read_lines(infile, offset):
+	for line in iter(infile.readline, b""):
+		offset[0] += len(line)
+		yield line.decode("utf-8")
+
+
+"""
+Function:    read_records
+Description: Streams (doi, pub_date, og_text) records from a JSONL or CSV
+             dump, starting at a byte offset.
+Inputs:      Dump filename, format ("jsonl" or "csv") and start offset.
+Outputs:     Generator of tuples (record, offset after the record); record
+             is None for lines without a doi.
+"""
+def read_records(filename, fmt, start):
+	with open(filename, "rb") as infile:
+		if fmt == "jsonl":
+			offset = [start]
+			infile.seek(start)
+			for line in read_lines(infile, offset):
+				if not line.strip():
+					continue
+				obj = json.loads(line)
+				record = tuple( obj.get(field) for field in FIELDS )
+				yield (record if record[0] else None), offset[0]
+
+		elif fmt == "csv":
+			# Header is always read from the start of the file
+			offset = [0]
+			header = next(csv.reader(read_lines(infile, offset)))
+			columns = [ header.index(field) for field in FIELDS ]
+
+			offset[0] = max(start, offset[0])
+			infile.seek(offset[0])
+			for row in csv.reader(read_lines(infile, offset)):
+				if not row:
+					continue
+				record = tuple( row[col] for col in columns )
+				yield (record if record[0] else None), offset[0]
+
+
+"""
+Function:    dump_format
+Description: Gives the format of a dump from its extension.
+Inputs:      Dump filename.
+Outputs:     "jsonl" or "csv".
+"""
+def dump_format(filename):
+	ext = os.path.splitext(filename)[1].lower()
+	if ext in (".jsonl", ".ndjson", ".json"):
+		return "jsonl"
+	if ext == ".csv":
+		return "csv"
+	raise ValueError(f"{filename}: unknown dump format (expected .jsonl or .csv)")
+
+
+"""
+Function:    get_progress
+Description: Gives the offset and row count reached in a dump by earlier
+             runs (zero if the dump is new or has changed size).
+Inputs:      Database connection, source key and dump size in bytes.
+Outputs:     Tuple (offset, rows).
+"""
+def get_progress(connection, source, size):
+	row = connection.execute("SELECT size, offset, rows FROM ingest_progress \
+				  WHERE source = ?", (source,)).fetchone()
+	if row is None:
+		return 0, 0
+	if row[0] != size:
+		print(f"{source}: size has changed since last run, starting over",
+		      file = sys.stderr)
+		return 0, 0
+	return row[1], row[2]
+
+
+"""
+Function:    ingest_dump
+Description: Loads one dump into the abstracts table.
+Inputs:      Database connection, dump filename, whether to update existing
+             abstracts (instead of skipping them) and whether to ignore
+             saved progress.
+Outputs:     Number of records read in this run.
+"""
+def ingest_dump(connection, filename, update = False, restart = False):
+	source = os.path.realpath(filename)
+	size = os.path.getsize(filename)
+	start, total = (0, 0) if restart else get_progress(connection, source, size)
+
+	if start >= size > 0:
+		print(f"{filename}: already loaded ({total} records)", file = sys.stderr)
+		return 0
+
+	insert = INSERT_UPDATE if update else INSERT_IGNORE
+	codec = text_store.load_codec(connection)   # compressed text mode
+	save_progress = "INSERT OR REPLACE INTO ingest_progress \
+			 (source, size, offset, rows) VALUES (?, ?, ?, ?)"
+
+	batch = []
+	uncommitted = 0
+	read = 0
+	skipped = 0
+	start_time = time.time()
+
+	for record, offset in read_records(filename, dump_format(filename), start):
+		read += 1
+		if record is None:
+			skipped += 1
+		else:
+			doi, pub_date, og_text = record
+			batch.append((doi, pub_date, codec.encode(og_text)))
+
+		if len(batch) >= BATCH_ROWS:
+			connection.executemany(insert, batch)
+			uncommitted += len(batch)
+			batch = []
+
+		# Rows and progress are committed together
+		if uncommitted >= COMMIT_ROWS:
+			connection.execute(save_progress, (source, size, offset, total + read))
+			connection.commit()
+			uncommitted = 0
+			report_progress(filename, offset, start, size, total + read, start_time)
+
+	if batch:
+		connection.executemany(insert, batch)
+	connection.execute(save_progress, (source, size, size, total + read))
+	connection.commit()
+	report_progress(filename, size, start, size, total + read, start_time)
+
+	if skipped:
+		print(f"{filename}: skipped {skipped} records without a doi", file = sys.stderr)
+
+	return read
+
+
+"""
+Function:    report_progress
+Description: Prints how far a load has got.
+Inputs:      Dump filename, offset reached, offset the run started at,
+             dump size, records read and the time the run started.
+Outputs:     None
+"""
+def report_progress(filename, offset, start, size, rows, start_time):
+	elapsed = max(time.time() - start_time, 1e-9)
+	percent = 100.0 * offset / size if size else 100.0
+	print(f"{filename}: {percent:5.1f}%  {rows} records  "
+	      f"{(offset - start) / elapsed / 1e6:.1f} MB/s", file = sys.stderr)
+
+
+"""
+Function:    ingest
+Description: Loads dumps into the database, with secondary indexes dropped
+             while loading and rebuilt once every dump has loaded. An
+             interrupted load leaves them to be built by the run which
+             finishes it.
+Inputs:      Database filename, list of dump filenames, whether to update
+             existing abstracts and whether to ignore saved progress.
+Outputs:     None
+"""
+def ingest(db_filename, filenames, update = False, restart = False):
+	connection = sqlite3.connect(db_filename)
+
+	# Bulk load settings: commits are not synced individually, but the
+	# database is still consistent after a crash (write-ahead log)
+	connection.execute("PRAGMA journal_mode = WAL")
+	connection.execute("PRAGMA synchronous = NORMAL")
+	connection.execute("PRAGMA cache_size = -262144")  # 256 MiB
+
+	connection.execute(CREATE_TABLE)
+	connection.execute(CREATE_PROGRESS)
+	for name, _ in INDEXES:
+		connection.execute(f'DROP INDEX IF EXISTS "{name}"')
+	connection.commit()
+
+	try:
+		for filename in filenames:
+			ingest_dump(connection, filename, update, restart)
+
+		# Build indexes once, over all rows
+		for _, definition in INDEXES:
+			connection.execute(definition)
+		connection.commit()
+	finally:
+		# Drop rows not yet committed with their progress (if interrupted)
+		connection.rollback()
+		connection.execute("PRAGMA journal_mode = DELETE")
+		connection.close()
+
+
+# MAIN FUNCTION
+def main():
+	parser = argparse.ArgumentParser(description = "Load abstracts into " + DB_FILE)
+	parser.add_argument("dumps", nargs = "+", help = "JSONL or CSV files")
+	parser.add_argument("--db", default = DB_FILE)
+	parser.add_argument("--update", action = "store_true",
+			    help = "overwrite pub_date and og_text of existing dois "
+				   "(clearing rep_text, rep_tokens and changed_tokens "
+				   "where og_text changes)")
+	parser.add_argument("--restart", action = "store_true",
+			    help = "ignore progress saved by earlier runs")
+	args = parser.parse_args()
+
+	# Abstracts can be longer than the default csv field limit
+	csv.field_size_limit(sys.maxsize)
+
+	ingest(args.db, args.dumps, args.update, args.restart)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+File: join_index.py
+Date created: 19 Oct 2026
+
+Description:
+Lines up the results of every detector on the same tested texts.
+Builds a key index across all detector test csv files, keyed on the
+doi and the version of the abstract (original or rewritten), and gives
+an aligned (n_texts x n_detectors) score matrix with a mask of which
+detector was tested on which text.
+"""
+import csv
+import numpy as np
+
+
+# GLOBAL VARIABLE(s)
+# Separator between doi and is_rewritten in a key
+KEY_SEP = "|"
+
+
+"""
+Function:    retrieve_data
+Description: Opens the experiment results csv and gives the doi,
+             is_writtten and detection probability as arrays.
+Inputs:      Name of file which contains the aforementioned data.
+Outputs:     Tuple of arrays (keys, labels, scores), where each key
+             identifies the tested text as "doi|is_rewritten".
+"""
+def retrieve_data(filename):
+	keys   = []
+	labels = []
+	scores = []
+
+	with open(filename, "r") as csv_file:
+		reader = csv.reader(csv_file, delimiter=",")
+
+		next(reader, None)  # skip column titles
+
+		# Read results into lists
+		for row in reader:
+			keys.append(row[0] + KEY_SEP + row[3])
+			labels.append(int(row[3]))
+			scores.append(float(row[4]))
+
+	return np.array(keys), np.array(labels), np.array(scores)
+
+
+"""
+Function:    build_index
+Description: Joins the results of several detectors on the tested text.
+             All keys are concatenated and de-duplicated in one sort
+             (np.unique), and scores are scattered into place, so no
+             per-row lookups are made.
+Inputs:      List of detector tuples whose first element is the test
+             csv filename (as in roc_test.DETECTORS).
+Outputs:     Tuple (keys, labels, scores, mask): n unique keys, their n
+             labels, an (n, k) score matrix (nan where missing) and an
+             (n, k) boolean mask, True where the detector has a result.
+"""
+def build_index(detectors):
+	results = [ retrieve_data(detector[0]) for detector in detectors ]
+	k = len(results)
+
+	all_keys   = np.concatenate([ result[0] for result in results ])
+	all_labels = np.concatenate([ result[1] for result in results ])
+	all_scores = np.concatenate([ result[2] for result in results ])
+	all_cols   = np.repeat(np.arange(k), [ len(result[0]) for result in results ])
+
+	keys, rows = np.unique(all_keys, return_inverse = True)
+
+	labels = np.zeros(len(keys), dtype = int)
+	labels[rows] = all_labels
+
+	scores = np.full((len(keys), k), np.nan)
+	scores[rows, all_cols] = all_scores
+
+	mask = ~np.isnan(scores)
+
+	return keys, labels, scores, mask
+
+
+"""
+Function:    key_doi
+Description: Gives the doi part of each key.
+Inputs:      Array of keys (as from build_index).
+Outputs:     Array of doi strings.
+"""
+def key_doi(keys):
+	return np.array([ key.rsplit(KEY_SEP, 1)[0] for key in keys ])
@@ -0,0 +1,384 @@
+"""
+File: replicates.py
+Date created: 19 Oct 2026
+
+Description:
+Generates many independent replicate test sets at once (as
+gen_tests_csv.test_indices does for one), to study how much the reported
+ROC and TPR/FPR vary with the choice of sample. All replicates are drawn
+as one index/label matrix from a NumPy Generator, so the global random
+state is never touched. Replicate r of a file is reproducible from the
+file's seed.
+
+The replicate file is evaluated in batch against each detector's
+results ("evaluate"): every replicate is scored on those of its texts the
+detector has results for, and the AUC, TPR/FPR and number of scored texts
+of every replicate are written to RESULTS_FILE. Replicates drawn from the
+whole database rarely overlap the texts a detector was tested on, until
+the replicate test sets themselves have been run through the detectors.
+
+Until then, the variation of a detector's results is estimated by
+resampling them ("bootstrap"): every replicate is a bootstrap sample of
+the detector's results (with replacement, the same number of original
+and rewritten abstracts as tested), and all replicates are summarised in
+batch. The AUC and the TPR/FPR at each threshold of
+summaries.derive_rates are reported as percentile bands.
+
+Usage:
+	python replicates.py generate [--replicates N] [--seed S]
+	python replicates.py evaluate
+	python replicates.py bootstrap [--replicates N] [--seed S]
+"""
+import argparse
+import csv
+import sqlite3
+import numpy as np
+
+import gen_tests_csv
+import join_index
+import roc_test
+import summaries
+
+
+# GLOBAL VARIABLE(s)
+NUM_REPLICATES = 1000
+NUM_TESTS = gen_tests_csv.NUM_TESTS
+DB_FILE = "abstract_db.sqlite"
+
+# Pseudo-random number generator seed (for reproducibility)
+PRNG_SEED = 1
+
+# Replicate file and evaluation results
+REPLICATE_FILE = "replicates.npz"
+RESULTS_FILE = "replicate_results.npz"
+STATS_FILE = "replicate_stats.csv"
+RATES_FILE = "replicate_rates.csv"
+
+# Most resampled results held at once (bounds memory for large test sets)
+BLOCK_ELEMENTS = 1 << 24
+
+# Percentiles reported for the AUC and the TPR/FPR bands
+PERCENTILES = [2.5, 50, 97.5]
+
+
+"""
+Function:    retrieve_dois
+Description: Opens the experiment database and gives the doi of every
+             abstract, in the order of gen_tests_csv.retrieve_data.
+Inputs:      Name of the database file.
+Outputs:     Array of doi strings.
+"""
+def retrieve_dois(db_filename):
+	# Open DB
+	connection = sqlite3.connect(db_filename)
+	cursor = connection.cursor()
+
+	# Get data
+	cursor.execute("SELECT doi FROM abstracts ORDER BY rowid")
+	data = cursor.fetchall()
+
+	# Close DB
+	connection.close()
+
+	return np.array([ row[0] for row in data ])
+
+
+"""
+Function:    replicate_indices
+Description: Draws replicate test sets, each a sample of num_s abstracts
+             without replacement, each abstract randomly original or
+             rewritten.
+Inputs:      Size of input list, number of samples per replicate, number
+             of replicates and seed.
+Outputs:     Tuple of arrays (indices, labels), both of shape
+             (num_reps, num_s); labels are 1 for rewritten ("RE") and 0
+             for original ("OR"), as is_rewritten in the test csv files.
+"""
+def replicate_indices(in_size, num_s, num_reps, seed = PRNG_SEED):
+	if num_s > in_size:
+		raise ValueError(f"cannot sample {num_s} of {in_size} abstracts")
+
+	rng = np.random.default_rng(seed)
+	indices = np.empty((num_reps, num_s), dtype = np.int64)
+
+	# Floyd's algorithm, one step for every replicate at once: for each
+	# j from in_size - num_s up, pick t from [0, j], or j itself if t has
+	# already been picked (O(num_reps * num_s^2), whatever in_size is)
+	for pos, j in enumerate(range(in_size - num_s, in_size)):
+		t = rng.integers(0, j + 1, size = num_reps)
+		taken = (indices[:, :pos] == t[:, None]).any(axis = 1)
+		indices[:, pos] = np.where(taken, j, t)
+
+	# Floyd's algorithm favours later indices in later positions, so each
+	# replicate is shuffled (as random.sample gives a random order)
+	indices = rng.permuted(indices, axis = 1)
+
+	labels = rng.integers(0, 2, size = (num_reps, num_s), dtype = np.uint8)
+
+	return indices, labels
+
+
+"""
+Function:    write_replicates
+Description: Writes replicate test sets to a compressed file.
+Inputs:      Arrays of indices and labels, array of abstract dois, seed and
+             output filename.
+Outputs:     None
+"""
+def write_replicates(indices, labels, dois, seed, out_filename):
+	# Smallest integer type which holds every index
+	index_type = np.min_scalar_type(max(len(dois) - 1, 0))
+	np.savez_compressed(out_filename,
+			    indices = indices.astype(index_type),
+			    labels  = labels,
+			    dois    = dois,
+			    seed    = seed)
+
+
+"""
+Function:    read_replicates
+Description: Reads replicate test sets from file.
+Inputs:      Name of the replicate file.
+Outputs:     Tuple of arrays (indices, labels, dois).
+"""
+def read_replicates(filename):
+	with np.load(filename) as replicates:
+		return (replicates["indices"].astype(np.int64),
+			replicates["labels"],
+			replicates["dois"])
+
+
+"""
+Function:    score_lookup
+Description: Arranges a detector's results by abstract and label.
+Inputs:      Array of abstract dois (as in the replicate file) and the name
+             of the detector's test csv.
+Outputs:     Array of shape (n_abstracts, 2), the score for the original
+             (column 0) and rewritten (column 1) abstract, nan if untested.
+"""
+def score_lookup(dois, filename):
+	keys, labels, scores = join_index.retrieve_data(filename)
+	result_dois = join_index.key_doi(keys)
+
+	order = np.argsort(dois)
+	pos = np.searchsorted(dois, result_dois, sorter = order)
+	rows = order[np.minimum(pos, len(dois) - 1)]
+	found = dois[rows] == result_dois
+
+	lookup = np.full((len(dois), 2), np.nan)
+	lookup[rows[found], labels[found]] = scores[found]
+
+	return lookup
+
+
+"""
+Function:    replicate_counts
+Description: Summarises every replicate's scored texts at once, as
+             summaries.py does for one test set.
+Inputs:      Arrays of indices and labels (as from replicate_indices), and
+             the score lookup (as from score_lookup).
+Outputs:     Tuple (counts, scored): counts of shape
+             (num_reps, 2, summaries.RESOLUTION + 1) and the number of
+             scored original and rewritten texts, shape (num_reps, 2).
+"""
+def replicate_counts(indices, labels, lookup):
+	num_reps = len(indices)
+	width = summaries.RESOLUTION + 1
+
+	scores = lookup[indices, labels]
+	has_score = ~np.isnan(scores)
+
+	rep = np.arange(num_reps)[:, None]
+	flat = (rep * 2 + labels) * width + summaries.score_bins(np.where(has_score, scores, 0))
+	counts = np.bincount(flat[has_score], minlength = num_reps * 2 * width)
+	counts = counts.reshape(num_reps, 2, width)
+
+	return counts, counts.sum(axis = 2)
+
+
+"""
+Function:    evaluate_replicates
+Description: Gives the AUC and TPR/FPR of every replicate for a detector,
+             over the replicate's texts which the detector has results for.
+Inputs:      Arrays of indices, labels and dois (as from read_replicates)
+             and the name of the detector's test csv.
+Outputs:     Tuple of arrays (aucs, tpr, fpr, scored); tpr and fpr have
+             one row per replicate (at the summaries.derive_rates
+             thresholds), scored is as from replicate_counts. Results are
+             nan where a replicate has no scored text of a label.
+"""
+def evaluate_replicates(indices, labels, dois, filename):
+	lookup = score_lookup(dois, filename)
+	counts, scored = replicate_counts(indices, labels, lookup)
+
+	_, tpr, fpr = summaries.derive_rates(counts)
+	return summaries.derive_auc(counts), tpr, fpr, scored
+
+
+"""
+Function:    write_results
+Description: Writes the per-replicate results of every detector to a
+             compressed file.
+Inputs:      Detector labels, list of result tuples (as from
+             evaluate_replicates, in the same order) and output filename.
+Outputs:     None
+"""
+def write_results(names, results, out_filename):
+	np.savez_compressed(out_filename,
+			    detectors = np.array(names),
+			    aucs      = np.array([ result[0] for result in results ]),
+			    tpr       = np.array([ result[1] for result in results ], dtype = np.float32),
+			    fpr       = np.array([ result[2] for result in results ], dtype = np.float32),
+			    scored    = np.array([ result[3] for result in results ]))
+
+
+"""
+Function:    bootstrap_counts
+Description: Summarises bootstrap replicates of a detector's results at
+             once, as summaries.py does for one test set. Each replicate
+             resamples the original and the rewritten abstracts separately.
+Inputs:      Arrays of labels (is_rewritten) and scores, number of
+             replicates and a NumPy Generator.
+Outputs:     Array of counts of shape (num_reps, 2, summaries.RESOLUTION + 1).
+"""
+def bootstrap_counts(labels, scores, num_reps, rng):
+	width = summaries.RESOLUTION + 1
+	counts = np.zeros((num_reps, 2, width), dtype = np.int64)
+
+	for label in (0, 1):
+		bins = summaries.score_bins(scores[labels == label])
+		n = len(bins)
+		if n == 0:
+			continue
+
+		block = max(1, BLOCK_ELEMENTS // n)
+		for start in range(0, num_reps, block):
+			stop = min(start + block, num_reps)
+			rows = rng.integers(0, n, size = (stop - start, n))
+
+			flat = np.arange(stop - start)[:, None] * width + bins[rows]
+			counts[start:stop, label] = np.bincount(flat.ravel(),
+					minlength = (stop - start) * width).reshape(-1, width)
+
+	return counts
+
+
+"""
+Function:    bootstrap_replicates
+Description: Gives the AUC and TPR/FPR of every bootstrap replicate of a
+             detector's results.
+Inputs:      Name of the detector's test csv, number of replicates and a
+             NumPy Generator.
+Outputs:     Tuple of arrays (aucs, tpr, fpr); tpr and fpr have one row
+             per replicate (at the summaries.derive_rates thresholds).
+"""
+def bootstrap_replicates(filename, num_reps, rng):
+	_, labels, scores = join_index.retrieve_data(filename)
+	counts = bootstrap_counts(labels, scores, num_reps, rng)
+
+	_, tpr, fpr = summaries.derive_rates(counts)
+	return summaries.derive_auc(counts), tpr, fpr
+
+
+"""
+Function:    write_rate_bands
+Description: Writes the percentile bands of TPR and FPR at every
+             threshold, for each detector.
+Inputs:      List of tuples (label, tpr, fpr), where tpr and fpr are as
+             from bootstrap_replicates, and the output filename.
+Outputs:     None
+"""
+def write_rate_bands(results, filename):
+	thresh_arr = np.arange(summaries.RESOLUTION + 1) / summaries.RESOLUTION
+
+	with open(filename, "w+") as outfile:
+		writer = csv.writer(outfile)
+		writer.writerow(["detector", "threshold"] +
+				[ f"tpr_{q}%" for q in PERCENTILES ] +
+				[ f"fpr_{q}%" for q in PERCENTILES ])
+
+		for label, tpr, fpr in results:
+			# Rates are undefined (nan) only where a label was not tested
+			with np.errstate(invalid = "ignore"):
+				tpr_bands = np.nanpercentile(tpr, PERCENTILES, axis = 0)
+				fpr_bands = np.nanpercentile(fpr, PERCENTILES, axis = 0)
+
+			for k, thresh in enumerate(thresh_arr):
+				writer.writerow([label, f"{thresh:.6g}"] +
+						[ f"{val:.6g}" for val in tpr_bands[:, k] ] +
+						[ f"{val:.6g}" for val in fpr_bands[:, k] ])
+
+
+# MAIN FUNCTION
+def main():
+	parser = argparse.ArgumentParser(description = "Replicate test sets.")
+	commands = parser.add_subparsers(dest = "command", required = True)
+
+	gen_parser = commands.add_parser("generate", help = "write " + REPLICATE_FILE)
+	gen_parser.add_argument("--replicates", type = int, default = NUM_REPLICATES)
+	gen_parser.add_argument("--seed", type = int, default = PRNG_SEED)
+
+	commands.add_parser("evaluate", help = "evaluate " + REPLICATE_FILE +
+					       ", write " + RESULTS_FILE)
+
+	boot_parser = commands.add_parser("bootstrap",
+					  help = "write " + STATS_FILE + " and " + RATES_FILE)
+	boot_parser.add_argument("--replicates", type = int, default = NUM_REPLICATES)
+	boot_parser.add_argument("--seed", type = int, default = PRNG_SEED)
+
+	args = parser.parse_args()
+
+	if args.command == "generate":
+		dois = retrieve_dois(DB_FILE)
+		indices, labels = replicate_indices(len(dois), NUM_TESTS,
+						    args.replicates, args.seed)
+		write_replicates(indices, labels, dois, args.seed, REPLICATE_FILE)
+
+	elif args.command == "evaluate":
+		indices, labels, dois = read_replicates(REPLICATE_FILE)
+		names = [ label for _, label in roc_test.DETECTORS ]
+		results = [ evaluate_replicates(indices, labels, dois, filename)
+			    for filename, _ in roc_test.DETECTORS ]
+
+		for label, (aucs, _, _, scored) in zip(names, results):
+			aucs = aucs[~np.isnan(aucs)]
+			summary = (f"{label:>12}  {len(aucs):>6} of {len(indices)} replicates scored, "
+				   f"{scored.sum(axis = 1).mean():0.2f} texts scored on average")
+			if len(aucs) > 0:
+				bands = np.percentile(aucs, PERCENTILES)
+				summary += (f"  AUC = {aucs.mean():0.3f} "
+					    f"({bands[0]:0.3f} - {bands[-1]:0.3f})")
+			print(summary)
+
+		write_results(names, results, RESULTS_FILE)
+
+	elif args.command == "bootstrap":
+		rng = np.random.default_rng(args.seed)
+		results = []
+
+		with open(STATS_FILE, "w+") as outfile:
+			writer = csv.writer(outfile)
+			writer.writerow(["detector", "replicates", "auc_mean", "auc_std"] +
+					[ f"auc_{q}%" for q in PERCENTILES ])
+
+			for filename, label in roc_test.DETECTORS:
+				aucs, tpr, fpr = bootstrap_replicates(filename, args.replicates, rng)
+				results.append((label, tpr, fpr))
+				aucs = aucs[~np.isnan(aucs)]
+
+				if len(aucs) == 0:
+					print(f"{label:>12}  needs results for both labels, skipped")
+					writer.writerow([label, 0, "", ""] + [""] * len(PERCENTILES))
+					continue
+
+				bands = np.percentile(aucs, PERCENTILES)
+				print(f"{label:>12}  {len(aucs):>6} replicates  "
+				      f"AUC = {aucs.mean():0.3f} ({bands[0]:0.3f} - {bands[-1]:0.3f})")
+				writer.writerow([label, len(aucs), f"{aucs.mean():.6g}",
+						 f"{aucs.std():.6g}"] + [ f"{val:.6g}" for val in bands ])
+
+		write_rate_bands(results, RATES_FILE)
+
+
+if __name__ == "__main__":
+    main()
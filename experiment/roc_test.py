@@ -14,6 +14,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from sklearn import metrics
 
+import decimate
+
 
 # GLOBAL VARIABLE(s)
 # List of tuples, with the form (filename, plot_label)
@@ -49,15 +51,15 @@ def retrieve_data(filename):
 
 
 """
-Function:    draw_ROC
+Function:    compute_ROC
 Description: Gets a list of tuples containing results from an experiment and
-	     plots the ROC_AUR curve associated with it (uses SciKit Learn)
-Inputs:      The filename containing the experiment data
-	     List of tuples containing results for a detector, the target axis
-	     for PyPlot and the filename of the test csv.
-Outputs:     None
+	     computes the ROC_AUR curve associated with it (uses SciKit Learn).
+	     The AUC is computed on the full curve, which is then decimated
+	     to decimate.PIXEL_BUDGET vertices for plotting.
+Inputs:      The filename containing the experiment data.
+Outputs:     Tuple (fpr, tpr, roc_auc) of the decimated curve and exact AUC.
 """
-def draw_ROC(filename, target_ax, line_label):
+def compute_ROC(filename):
 	# Load file
 	exp_result = retrieve_data(filename)
 
@@ -65,18 +67,67 @@ def draw_ROC(filename, target_ax, line_label):
 	is_rewritten_list = [ int(datapoint[0]) for datapoint in exp_result ]
 	probability_list  = [ float(datapoint[1]) for datapoint in exp_result ]
 
-	# Compute and plot ROC
-	display = metrics.RocCurveDisplay.from_predictions(y_true = is_rewritten_list,
-							   y_pred = probability_list,
-							   drop_intermediate = False,
-							   ax = target_ax,
-							   name = line_label,
-							   linewidth = 1.5,
-							   alpha = 0.85)
+	# Compute ROC (exact AUC from every operating point)
+	fpr, tpr, thresholds = metrics.roc_curve(y_true = is_rewritten_list,
+						 y_score = probability_list,
+						 drop_intermediate = False)
+	roc_auc = metrics.auc(fpr, tpr)
 
+	# Key operating point: maximum Youden's J (tpr - fpr)
+	key_points = [ int(np.argmax(tpr - fpr)) ]
 
-# MAIN FUNCTION
-def main():
+	# Decimate ROC
+	fpr_dec, tpr_dec, _ = decimate.decimate_curve(fpr, tpr, keep = key_points)
+
+	return fpr_dec, tpr_dec, roc_auc
+
+
+"""
+Function:    plot_ROC
+Description: Plots a (computed) ROC_AUR curve.
+Inputs:      Tuple (fpr, tpr, roc_auc) as from compute_ROC, the target
+	     axis for PyPlot and the line label.
+Outputs:     None
+"""
+def plot_ROC(curve, target_ax, line_label):
+	fpr, tpr, roc_auc = curve
+
+	target_ax.plot(fpr,
+		       tpr,
+		       label = f"{line_label} (AUC = {roc_auc:0.2f})",
+		       linewidth = 1.5,
+		       alpha = 0.85)
+
+	# Appearance configuration (as in RocCurveDisplay)
+	target_ax.set_xlabel("False Positive Rate (Positive label: 1)")
+	target_ax.set_ylabel("True Positive Rate (Positive label: 1)")
+	target_ax.set_xlim(-0.01, 1.01)
+	target_ax.set_ylim(-0.01, 1.01)
+	target_ax.set_aspect("equal")
+	target_ax.legend(loc = "lower right")
+
+
+"""
+Function:    draw_ROC
+Description: Gets a list of tuples containing results from an experiment and
+	     plots the ROC_AUR curve associated with it (uses SciKit Learn)
+Inputs:      The filename containing the experiment data
+	     List of tuples containing results for a detector, the target axis
+	     for PyPlot and the filename of the test csv.
+Outputs:     None
+"""
+def draw_ROC(filename, target_ax, line_label):
+	plot_ROC(compute_ROC(filename), target_ax, line_label)
+
+
+"""
+Function:    draw_figure
+Description: Draws and saves the ROC figure for all detectors.
+Inputs:      List of tuples, with the form (detector, curve), where
+	     detector is as in DETECTORS and curve is as from compute_ROC.
+Outputs:     None
+"""
+def draw_figure(curves):
 	# Create PyPlot objects
 	fig, main_ax = plt.subplots()
 	main_ax.set_title("Receiver Operating Characteristic (ROC) curves")
@@ -85,16 +136,21 @@ def main():
 	# Uncomment to set custom colours for line plots
 	plt.gca().set_prop_cycle(color=["#ee5e56", "#1aaeeb", "#74a00d", "#9c6ac3"])
 
-	# Draw ROC for 74a00dch detector
-	for detector in DETECTORS:
-		draw_ROC(detector[0], main_ax, detector[1])
+	# Draw ROC for each detector
+	for detector, curve in curves:
+		plot_ROC(curve, main_ax, detector[1])
 
 	# Render
 	plt.savefig("ROC.svg")
 	plt.savefig("ROC.png")
+
+
+# MAIN FUNCTION
+def main():
+	curves = [ (detector, compute_ROC(detector[0])) for detector in DETECTORS ]
+	draw_figure(curves)
 	plt.show()
 
 
 if __name__ == "__main__":
     main()
-
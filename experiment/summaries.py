@@ -0,0 +1,394 @@
+"""
+File: summaries.py
+Date created: 19 Oct 2026
+
+Description:
+Mergeable summaries of detector results, so that test sets too large for
+one machine can be evaluated in shards. A summary is a fixed-resolution
+histogram of detection probabilities for each label (original and
+rewritten). Summaries of shards are merged exactly by adding them, and
+TPR/FPR, ROC/AUC and the histograms of hist_tests.py are derived from
+the merged summary.
+
+Score bins are 0 = {0} and k = ((k-1)/RESOLUTION, k/RESOLUTION], so for
+every threshold k/RESOLUTION the count of scores above it is exact (as in
+tpr_fpr_tests.get_tpr). The AUC and the histograms are exact for scores
+which lie on the grid (e.g. percentages when RESOLUTION is a multiple of
+100). Off the grid, ties are not resolved within a fine bin, and as the
+fine bins are right-closed while np.histogram bins are left-closed, a
+score just below a histogram edge (e.g. 0.1999 with 5 bins) is counted in
+the bin above it.
+
+A test csv is split into shard files once ("split", a single pass with
+the csv reader, as quoted text may contain line breaks), so each worker
+only reads its own shard.
+
+Usage:
+	python summaries.py split <test csv> <num shards> <out prefix>
+	python summaries.py map <shard csv> <out.npz>
+	python summaries.py reduce <out.npz> <in.npz> [<in.npz> ...]
+	python summaries.py report
+	python summaries.py local [--workers N]
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import numpy as np
+
+import decimate
+import hist_tests
+import roc_test
+import tpr_fpr_tests
+
+
+# GLOBAL VARIABLE(s)
+# Number of score bins above zero
+RESOLUTION = 1000
+
+# Rows read before counting (bounds worker memory)
+CHUNK_ROWS = 100000
+
+# Folder for shard and merged summaries
+SUMMARY_DIR = "summaries"
+
+# Number of worker processes in local mode
+WORKERS = 4
+
+
+"""
+Function:    score_bins
+Description: Gives the bin of each score (see file description).
+Inputs:      Array of scores between 0 and 1.
+Outputs:     Array of bin indices between 0 and RESOLUTION.
+"""
+def score_bins(scores):
+	# Rounding first stops e.g. 0.26 * 1000 = 260.00000000000003 from
+	# being put into bin 261
+	scaled = np.round(np.asarray(scores, dtype = float) * RESOLUTION, 6)
+	return np.clip(np.ceil(scaled), 0, RESOLUTION).astype(int)
+
+
+"""
+Function:    count_chunk
+Description: Counts a chunk of results into a summary.
+Inputs:      Lists of labels (is_rewritten) and scores.
+Outputs:     Array of counts of shape (2, RESOLUTION + 1), row 0 for
+             original abstracts and row 1 for rewritten abstracts.
+"""
+def count_chunk(labels, scores):
+	flat = np.asarray(labels, dtype = int) * (RESOLUTION + 1) + score_bins(scores)
+	counts = np.bincount(flat, minlength = 2 * (RESOLUTION + 1))
+	return counts.reshape(2, RESOLUTION + 1)
+
+
+"""
+Function:    split_csv
+Description: Splits a test csv into shard files (rows dealt out in turn),
+             each with the column titles.
+Inputs:      Name of the test csv and list of shard filenames.
+Outputs:     None
+"""
+def split_csv(filename, shard_filenames):
+	shard_files = [ open(shard_filename, "w+", newline = "")
+			for shard_filename in shard_filenames ]
+	try:
+		writers = [ csv.writer(shard_file) for shard_file in shard_files ]
+
+		with open(filename, "r", newline = "") as csv_file:
+			reader = csv.reader(csv_file, delimiter=",")
+
+			header = next(reader, None)
+			for writer in writers:
+				writer.writerow(header)
+
+			for i, row in enumerate(reader):
+				writers[i % len(writers)].writerow(row)
+	finally:
+		for shard_file in shard_files:
+			shard_file.close()
+
+
+"""
+Function:    summarise_csv
+Description: Streams a test csv (or a shard of one) and summarises it.
+Inputs:      Name of the csv.
+Outputs:     Array of counts (as from count_chunk).
+"""
+def summarise_csv(filename):
+	counts = np.zeros((2, RESOLUTION + 1), dtype = np.int64)
+	labels = []
+	scores = []
+
+	with open(filename, "r", newline = "") as csv_file:
+		reader = csv.reader(csv_file, delimiter=",")
+
+		next(reader, None)  # skip column titles
+
+		for row in reader:
+			labels.append(int(row[3]))
+			scores.append(float(row[4]))
+
+			if len(labels) == CHUNK_ROWS:
+				counts += count_chunk(labels, scores)
+				labels = []
+				scores = []
+
+	if labels:
+		counts += count_chunk(labels, scores)
+
+	return counts
+
+
+"""
+Function:    write_summary
+Description: Writes a summary to file.
+Inputs:      Array of counts and the output filename.
+Outputs:     None
+"""
+def write_summary(counts, filename):
+	np.savez_compressed(filename, counts = counts, resolution = RESOLUTION)
+
+
+"""
+Function:    read_summary
+Description: Reads a summary from file.
+Inputs:      Name of the summary file.
+Outputs:     Array of counts.
+"""
+def read_summary(filename):
+	with np.load(filename) as summary:
+		if int(summary["resolution"]) != RESOLUTION:
+			raise ValueError(f"{filename} has resolution {int(summary['resolution'])}, "
+					 f"expected {RESOLUTION}")
+		return summary["counts"]
+
+
+"""
+Function:    merge_summaries
+Description: Merges summaries (exactly, by adding the counts).
+Inputs:      List of summary filenames.
+Outputs:     Array of counts.
+"""
+def merge_summaries(filenames):
+	counts = np.zeros((2, RESOLUTION + 1), dtype = np.int64)
+	for filename in filenames:
+		counts += read_summary(filename)
+	return counts
+
+
+"""
+Function:    derive_rates
+Description: Gives true and false positive rate for every threshold on the
+             grid, as tpr_fpr_tests.compute_rates (a reading is positive
+             when it is above the threshold).
+Inputs:      Array of counts, optionally with leading batch dimensions
+             (shape (..., 2, RESOLUTION + 1)).
+Outputs:     Tuple of arrays (thresh_arr, tpr_arr, fpr_arr), undefined
+             rates are nan.
+"""
+def derive_rates(counts):
+	thresh_arr = np.arange(RESOLUTION + 1) / RESOLUTION
+
+	# Number of scores in bins above each bin
+	above = counts[..., ::-1].cumsum(axis = -1)[..., ::-1] - counts
+	totals = counts.sum(axis = -1, keepdims = True)
+
+	with np.errstate(invalid = "ignore", divide = "ignore"):
+		rates = above / totals
+
+	return thresh_arr, rates[..., 1, :], rates[..., 0, :]
+
+
+"""
+Function:    derive_auc
+Description: Gives the area under the ROC curve, i.e. the probability that
+             a rewritten abstract scores above an original one (ties count
+             one half).
+Inputs:      Array of counts, optionally with leading batch dimensions.
+Outputs:     AUC, or array of AUCs (nan if either label is missing).
+"""
+def derive_auc(counts):
+	neg = counts[..., 0, :].astype(float)
+	pos = counts[..., 1, :].astype(float)
+
+	neg_below = np.cumsum(neg, axis = -1) - neg
+	pairs = pos.sum(axis = -1) * neg.sum(axis = -1)
+
+	with np.errstate(invalid = "ignore", divide = "ignore"):
+		auc = np.sum(pos * (neg_below + 0.5 * neg), axis = -1) / pairs
+
+	return np.where(pairs > 0, auc, np.nan)
+
+
+"""
+Function:    derive_ROC
+Description: Gives the ROC curve, as roc_test.compute_ROC.
+Inputs:      Array of counts.
+Outputs:     Tuple (fpr, tpr, roc_auc) of the decimated curve and AUC.
+"""
+def derive_ROC(counts):
+	_, tpr_arr, fpr_arr = derive_rates(counts)
+
+	# From the highest threshold down, starting at (0, 0)
+	fpr = np.concatenate(([0.0], fpr_arr[::-1], [1.0]))
+	tpr = np.concatenate(([0.0], tpr_arr[::-1], [1.0]))
+
+	key_points = [ int(np.nanargmax(tpr - fpr)) ]
+	fpr_dec, tpr_dec, _ = decimate.decimate_curve(fpr, tpr, keep = key_points)
+
+	return fpr_dec, tpr_dec, derive_auc(counts)
+
+
+"""
+Function:    derive_hists
+Description: Gives the histograms of hist_tests.compute_hists, by adding
+             fine bins into the coarser histogram bins. Exact for scores
+             on the grid; see the file description for scores off it.
+Inputs:      Array of counts, and number of histogram bins (must divide
+             RESOLUTION).
+Outputs:     Tuple of arrays (edges, ori_counts, mod_counts).
+"""
+def derive_hists(counts, bins = hist_tests.BINS):
+	if RESOLUTION % bins != 0:
+		raise ValueError(f"BINS ({bins}) must divide RESOLUTION ({RESOLUTION})")
+
+	# Score k / RESOLUTION falls in [i / bins, (i + 1) / bins), last bin
+	# closed (fine bin k also holds scores just below k / RESOLUTION)
+	target = np.minimum(np.arange(RESOLUTION + 1) * bins // RESOLUTION, bins - 1)
+	ori_counts = np.bincount(target, weights = counts[0], minlength = bins).astype(int)
+	mod_counts = np.bincount(target, weights = counts[1], minlength = bins).astype(int)
+
+	return np.linspace(0, 1, bins + 1), ori_counts, mod_counts
+
+
+"""
+Function:    summary_filename
+Description: Gives the merged summary filename of a detector.
+Inputs:      Detector label.
+Outputs:     Path of the summary file.
+"""
+def summary_filename(label):
+	return os.path.join(SUMMARY_DIR, label + ".npz")
+
+
+"""
+Function:    shard_filenames
+Description: Gives the shard csv filenames for a prefix.
+Inputs:      Filename prefix and number of shards.
+Outputs:     List of filenames.
+"""
+def shard_filenames(prefix, num_shards):
+	return [ f"{prefix}_{shard}.csv" for shard in range(num_shards) ]
+
+
+"""
+Function:    map_shard
+Description: Worker step, summarises one shard file to file.
+Inputs:      Name of the shard csv and the output filename.
+Outputs:     Output filename.
+"""
+def map_shard(filename, out_filename):
+	write_summary(summarise_csv(filename), out_filename)
+	return out_filename
+
+
+"""
+Function:    reduce_shards
+Description: Reducer step, merges shard summaries to file.
+Inputs:      Output filename and list of shard summary filenames.
+Outputs:     None
+"""
+def reduce_shards(out_filename, in_filenames):
+	write_summary(merge_summaries(in_filenames), out_filename)
+
+
+"""
+Function:    report
+Description: Derives AUCs and draws the ROC, TPR/FPR and histogram figures
+             from the merged summary of each detector.
+Inputs:      None
+Outputs:     None
+"""
+def report():
+	counts = { detector[1]: read_summary(summary_filename(detector[1]))
+		   for detector in roc_test.DETECTORS }
+
+	for label, detector_counts in counts.items():
+		print(f"{label:>12}  n = {detector_counts.sum():>10}  "
+		      f"AUC = {derive_auc(detector_counts):0.3f}")
+
+	roc_test.draw_figure([ (detector, derive_ROC(counts[detector[1]]))
+			       for detector in roc_test.DETECTORS ])
+	tpr_fpr_tests.draw_figure([ (detector, derive_rates(counts[detector[1]]))
+				    for detector in tpr_fpr_tests.DETECTORS ])
+	hist_tests.draw_figure([ (detector, derive_hists(counts[detector[1]]))
+				 for detector in hist_tests.DETECTORS ])
+
+
+"""
+Function:    run_local
+Description: Runs the split, map and reduce steps on this machine, with
+             worker processes standing in for nodes.
+Inputs:      Number of worker processes (and shards per detector).
+Outputs:     None
+"""
+def run_local(workers = WORKERS):
+	os.makedirs(SUMMARY_DIR, exist_ok = True)
+
+	with multiprocessing.Pool(workers) as pool:
+		for filename, label in roc_test.DETECTORS:
+			shard_csvs = shard_filenames(os.path.join(SUMMARY_DIR, label), workers)
+			split_csv(filename, shard_csvs)
+
+			shard_files = [ os.path.splitext(shard_csv)[0] + ".npz"
+					for shard_csv in shard_csvs ]
+			pool.starmap(map_shard, zip(shard_csvs, shard_files))
+			reduce_shards(summary_filename(label), shard_files)
+
+			for shard_csv in shard_csvs:
+				os.remove(shard_csv)
+
+	report()
+
+
+# MAIN FUNCTION
+def main():
+	parser = argparse.ArgumentParser(description = "Sharded evaluation of detector results.")
+	commands = parser.add_subparsers(dest = "command", required = True)
+
+	split_parser = commands.add_parser("split", help = "split a test csv into shard files")
+	split_parser.add_argument("filename")
+	split_parser.add_argument("num_shards", type = int)
+	split_parser.add_argument("prefix", help = "shards are written to <prefix>_<shard>.csv")
+
+	map_parser = commands.add_parser("map", help = "summarise one shard csv")
+	map_parser.add_argument("filename")
+	map_parser.add_argument("out_filename")
+
+	reduce_parser = commands.add_parser("reduce", help = "merge shard summaries")
+	reduce_parser.add_argument("out_filename")
+	reduce_parser.add_argument("in_filenames", nargs = "+")
+
+	commands.add_parser("report", help = "draw figures from merged summaries in "
+					     + SUMMARY_DIR)
+
+	local_parser = commands.add_parser("local", help = "map, reduce and report locally")
+	local_parser.add_argument("--workers", type = int, default = WORKERS)
+
+	args = parser.parse_args()
+
+	if args.command == "split":
+		split_csv(args.filename, shard_filenames(args.prefix, args.num_shards))
+	elif args.command == "map":
+		map_shard(args.filename, args.out_filename)
+	elif args.command == "reduce":
+		reduce_shards(args.out_filename, args.in_filenames)
+	elif args.command == "report":
+		report()
+	elif args.command == "local":
+		run_local(args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+File: text_store.py
+Date created: 19 Oct 2026
+
+Description:
+Optional compressed storage of og_text and rep_text in the abstracts
+table. In compressed mode each text is stored as a zlib compressed BLOB,
+optionally with a preset dictionary trained on the database's own
+abstracts (stored in the text_compression table). Scripts read the
+database through fetch_rows, which gives rows whose text fields are only
+decompressed when they are actually read, so plain and compressed
+databases are read the same way.
+
+Usage:
+	python text_store.py compress [--dict] [--level N]
+	python text_store.py decompress
+	python text_store.py status
+"""
+import argparse
+import collections
+import sqlite3
+import zlib
+
+
+# GLOBAL VARIABLE(s)
+DB_FILE = "abstract_db.sqlite"
+
+# Columns holding abstract text
+TEXT_COLUMNS = ("og_text", "rep_text")
+
+# First byte of a compressed value
+MAGIC_PLAIN = b"\x01"   # zlib
+MAGIC_DICT  = b"\x02"   # zlib with the database's preset dictionary
+
+# Default zlib compression level
+LEVEL = 9
+
+# Dictionary training: abstracts sampled, and size (zlib window limit)
+DICT_SAMPLE_ROWS = 5000
+DICT_SIZE = 32 * 1024
+DICT_MAX_NGRAM = 4
+
+# Rows per batch when migrating
+MIGRATE_ROWS = 10000
+
+CREATE_SETTINGS = """CREATE TABLE "text_compression" (
+	"level"	INTEGER,
+	"dict"	BLOB
+)"""
+
+
+"""
+Class:       TextCodec
+Description: Compresses and decompresses text values. A codec without
+             a level leaves text uncompressed.
+"""
+class TextCodec:
+	def __init__(self, level = None, zdict = None):
+		self.level = level
+		self.zdict = zdict
+
+	"""
+	Function:    encode
+	Description: Gives the stored form of a text value.
+	Inputs:      Text (or None).
+	Outputs:     Compressed BLOB, or the text if not compressing.
+	"""
+	def encode(self, text):
+		if text is None or self.level is None:
+			return text
+
+		if self.zdict:
+			compressor = zlib.compressobj(self.level, zdict = self.zdict)
+			magic = MAGIC_DICT
+		else:
+			compressor = zlib.compressobj(self.level)
+			magic = MAGIC_PLAIN
+
+		data = compressor.compress(text.encode("utf-8")) + compressor.flush()
+		return magic + data
+
+	"""
+	Function:    decode
+	Description: Gives the text of a stored value (plain or compressed).
+	Inputs:      Stored value.
+	Outputs:     Text (or the value unchanged if it is not compressed).
+	"""
+	def decode(self, value):
+		if not isinstance(value, bytes):
+			return value
+
+		magic = value[:1]
+		if magic == MAGIC_PLAIN:
+			decompressor = zlib.decompressobj()
+		elif magic == MAGIC_DICT:
+			if self.zdict is None:
+				raise ValueError("value needs a dictionary, but the database has none")
+			decompressor = zlib.decompressobj(zdict = self.zdict)
+		else:
+			return value
+
+		return (decompressor.decompress(value[1:]) + decompressor.flush()).decode("utf-8")
+
+
+"""
+Class:       AbstractRow
+Description: A database row (tuple) whose values are decoded when first
+             read, so texts which are never used are never decompressed
+             and texts which are read again are not decompressed again.
+"""
+class AbstractRow(tuple):
+	def __new__(cls, values, codec):
+		row = tuple.__new__(cls, values)
+		row.codec = codec
+		row.decoded = {}
+		return row
+
+	"""
+	Function:    decode
+	Description: Gives a decoded value of the row, decoding it only once.
+	Inputs:      Index of the value.
+	Outputs:     Decoded value.
+	"""
+	def decode(self, index):
+		value = tuple.__getitem__(self, index)
+		index %= len(self)
+		if index not in self.decoded:
+			self.decoded[index] = self.codec.decode(value)
+		return self.decoded[index]
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return tuple( self.decode(i) for i in range(*index.indices(len(self))) )
+		return self.decode(index)
+
+	def __iter__(self):
+		for index in range(len(self)):
+			yield self.decode(index)
+
+
+"""
+Function:    load_codec
+Description: Gives the codec of a database (uncompressed if it has no
+             text_compression table).
+Inputs:      Database connection.
+Outputs:     TextCodec
+"""
+def load_codec(connection):
+	exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' \
+				     AND name = 'text_compression'").fetchone()
+	if not exists:
+		return TextCodec()
+
+	row = connection.execute("SELECT level, dict FROM text_compression").fetchone()
+	if row is None:
+		return TextCodec()
+	return TextCodec(row[0], row[1])
+
+
+"""
+Function:    fetch_rows
+Description: Opens the experiment database and runs a query, giving rows
+             whose text fields are decompressed on read.
+Inputs:      Name of the database file, the query and its parameters.
+Outputs:     List of AbstractRow.
+"""
+def fetch_rows(db_filename, query, params = ()):
+	# Open DB
+	connection = sqlite3.connect(db_filename)
+	codec = load_codec(connection)
+
+	# Get data
+	data = [ AbstractRow(row, codec) for row in connection.execute(query, params) ]
+
+	# Close DB
+	connection.close()
+
+	return data
+
+
+"""
+Function:    train_dictionary
+Description: Builds a zlib preset dictionary from the most useful word
+             n-grams of a sample of abstracts (frequency times length),
+             with the most useful last, as zlib finds near matches
+             cheapest.
+Inputs:      Database connection and its current codec.
+Outputs:     Dictionary bytes (at most DICT_SIZE).
+"""
+def train_dictionary(connection, codec):
+	counts = collections.Counter()
+	query = f"SELECT {', '.join(TEXT_COLUMNS)} FROM abstracts LIMIT {DICT_SAMPLE_ROWS}"
+
+	for row in connection.execute(query):
+		for value in row:
+			words = (codec.decode(value) or "").split()
+			for n in range(1, DICT_MAX_NGRAM + 1):
+				for i in range(len(words) - n + 1):
+					counts[" ".join(words[i:i + n]) + " "] += 1
+
+	# Only n-grams seen more than once are worth their space
+	ranked = sorted(( (count * len(gram), gram) for gram, count in counts.items()
+			  if count > 1 ), reverse = True)
+
+	chosen = []
+	size = 0
+	for _, gram in ranked:
+		gram_size = len(gram.encode("utf-8"))
+		if size + gram_size > DICT_SIZE:
+			break
+		chosen.append(gram)
+		size += gram_size
+
+	return "".join(reversed(chosen)).encode("utf-8")
+
+
+"""
+Function:    migrate
+Description: Rewrites every text value with a new codec, in one
+             transaction, and records the new codec. Space is reclaimed
+             afterwards with VACUUM.
+Inputs:      Database filename, new compression level (None to store
+             plain text) and whether to train a dictionary.
+Outputs:     None
+"""
+def migrate(db_filename, level = None, use_dict = False):
+	connection = sqlite3.connect(db_filename)
+	old_codec = load_codec(connection)
+
+	zdict = train_dictionary(connection, old_codec) if (level is not None and use_dict) else None
+	new_codec = TextCodec(level, zdict)
+
+	columns = ", ".join(TEXT_COLUMNS)
+	update = (f"UPDATE abstracts SET {', '.join(col + ' = ?' for col in TEXT_COLUMNS)} "
+		  "WHERE rowid = ?")
+
+	# Batches by rowid, so rows are never read while being updated
+	last_rowid = -1
+	while True:
+		rows = connection.execute(f"SELECT {columns}, rowid FROM abstracts \
+					    WHERE rowid > ? ORDER BY rowid LIMIT ?",
+					  (last_rowid, MIGRATE_ROWS)).fetchall()
+		if not rows:
+			break
+		last_rowid = rows[-1][-1]
+
+		batch = [ tuple( new_codec.encode(old_codec.decode(value)) for value in row[:-1] )
+			  + (row[-1],) for row in rows ]
+		connection.executemany(update, batch)
+
+	connection.execute("DROP TABLE IF EXISTS text_compression")
+	if level is not None:
+		connection.execute(CREATE_SETTINGS)
+		connection.execute("INSERT INTO text_compression (level, dict) VALUES (?, ?)",
+				   (level, zdict))
+	connection.commit()
+
+	connection.execute("VACUUM")
+	connection.close()
+
+
+"""
+Function:    status
+Description: Prints the compression mode and the stored size of the text.
+Inputs:      Database filename.
+Outputs:     None
+"""
+def status(db_filename):
+	connection = sqlite3.connect(db_filename)
+	codec = load_codec(connection)
+
+	stored = 0
+	plain = 0
+	query = f"SELECT {', '.join(TEXT_COLUMNS)} FROM abstracts"
+	for row in connection.execute(query):
+		for value in row:
+			if value is None:
+				continue
+			stored += len(value) if isinstance(value, bytes) else len(value.encode("utf-8"))
+			plain += len(codec.decode(value).encode("utf-8"))
+	connection.close()
+
+	if codec.level is None:
+		mode = "plain text"
+	else:
+		mode = f"zlib level {codec.level}" + (" with dictionary" if codec.zdict else "")
+
+	ratio = plain / stored if stored else 1.0
+	print(f"{db_filename}: {mode}, text {plain} bytes stored in {stored} bytes "
+	      f"({ratio:.2f}x)")
+
+
+# MAIN FUNCTION
+def main():
+	parser = argparse.ArgumentParser(description = "Compressed abstract text storage.")
+	parser.add_argument("--db", default = DB_FILE)
+	commands = parser.add_subparsers(dest = "command", required = True)
+
+	compress_parser = commands.add_parser("compress", help = "compress og_text and rep_text")
+	compress_parser.add_argument("--dict", action = "store_true",
+				     help = "train and use a shared dictionary")
+	compress_parser.add_argument("--level", type = int, default = LEVEL)
+
+	commands.add_parser("decompress", help = "store og_text and rep_text as plain text")
+	commands.add_parser("status", help = "show the compression mode and ratio")
+
+	args = parser.parse_args()
+
+	if args.command == "compress":
+		migrate(args.db, args.level, args.dict)
+	elif args.command == "decompress":
+		migrate(args.db, None)
+	status(args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -146,72 +146,46 @@ def get_tpr(data, thresh):
 
 
 """
-Function:    draw_fpr_curve
+Function:    compute_rates
 Description: Gets a test csv containing results from an experiment and
-	     plots false positive rate as a function of (variable) decision threshold.
-Inputs:      The filename containing the experiment data, and the target
-	     axis for PyPlot.
-Outputs:     None
+	     computes true and false positive rate as functions of decision
+	     threshold (POINT_RES thresholds between 0 and 1).
+Inputs:      The filename containing the experiment data.
+Outputs:     Tuple of arrays (thresh_arr, tpr_arr, fpr_arr), undefined
+	     rates are nan.
 """
-def draw_fpr_curve(detector, target_axes):
-	# Local variable definition
-	filename      = detector[0]
-	subplt_title  = detector[1]
-	subplt_loc    = detector[2]
-	subplt_x      = subplt_loc[0]
-	subplt_y      = subplt_loc[1]
-
+def compute_rates(filename):
 	# Load file
 	exp_result = retrieve_data(filename)
 
 	# Create data
 	thresh_arr = np.linspace(0, 1, POINT_RES)
-	# map get_fpr onto array
-	fpr_arr = [ get_fpr(exp_result, thr) for thr in thresh_arr ]
+	# map get_tpr and get_fpr onto array
+	tpr_arr = np.array([ get_tpr(exp_result, thr) for thr in thresh_arr ], dtype = float)
+	fpr_arr = np.array([ get_fpr(exp_result, thr) for thr in thresh_arr ], dtype = float)
 
-	# Plot data
-	target_axes[subplt_x, subplt_y].plot(thresh_arr,
-				             fpr_arr,
-				             label = "False Positive Rate",
-				             color = FPR_COLOUR,
-				             alpha = LINE_ALPHA)
-
-	# Appearance configuration
-	target_axes[subplt_x, subplt_y].grid(linestyle="--")
-	target_axes[subplt_x, subplt_y].set_ylabel("Rate")
-	target_axes[subplt_x, subplt_y].set_xlabel("Threshold")
-	target_axes[subplt_x, subplt_y].set_title(subplt_title)
+	return thresh_arr, tpr_arr, fpr_arr
 
 
 """
-Function:    draw_tpr_curve
-Description: Gets a test csv containing results from an experiment and
-	     plots true positive rate as a function of (variable) decision threshold.
-Inputs:      The filename containing the experiment data, and the target
-	     axis for PyPlot.
+Function:    plot_rate_curve
+Description: Plots a rate (tpr or fpr) as a function of decision threshold.
+Inputs:      Array of thresholds, array of rates, the detector tuple (as in
+	     DETECTORS), the target axes for PyPlot, the line label and colour.
 Outputs:     None
 """
-def draw_tpr_curve(detector, target_axes):
+def plot_rate_curve(thresh_arr, rate_arr, detector, target_axes, line_label, colour):
 	# Local variable definition
-	filename      = detector[0]
 	subplt_title  = detector[1]
 	subplt_loc    = detector[2]
 	subplt_x      = subplt_loc[0]
 	subplt_y      = subplt_loc[1]
 
-	# Load file
-	exp_result = retrieve_data(filename)
-
-	# Create data
-	thresh_arr = np.linspace(0, 1, POINT_RES)
-	# map get_fpr onto array
-	tpr_arr = [ get_tpr(exp_result, thr) for thr in thresh_arr ]
-
 	# Plot data
 	target_axes[subplt_x, subplt_y].plot(thresh_arr,
-				             tpr_arr,
-				             label = "True Positive Rate",
-				             color = TPR_COLOUR,
+				             rate_arr,
+				             label = line_label,
+				             color = colour,
 				             alpha = LINE_ALPHA)
 
 	# Appearance configuration
@@ -221,10 +195,42 @@ def draw_tpr_curve(detector, target_axes):
 	target_axes[subplt_x, subplt_y].set_title(subplt_title)
 
 
+"""
+Function:    draw_fpr_curve
+Description: Gets a test csv containing results from an experiment and
+	     plots false positive rate as a function of (variable) decision threshold.
+Inputs:      The filename containing the experiment data, and the target
+	     axis for PyPlot.
+Outputs:     None
+"""
+def draw_fpr_curve(detector, target_axes):
+	thresh_arr, _, fpr_arr = compute_rates(detector[0])
+	plot_rate_curve(thresh_arr, fpr_arr, detector, target_axes,
+			"False Positive Rate", FPR_COLOUR)
 
 
-# MAIN FUNCTION
-def main():
+"""
+Function:    draw_tpr_curve
+Description: Gets a test csv containing results from an experiment and
+	     plots true positive rate as a function of (variable) decision threshold.
+Inputs:      The filename containing the experiment data, and the target
+	     axis for PyPlot.
+Outputs:     None
+"""
+def draw_tpr_curve(detector, target_axes):
+	thresh_arr, tpr_arr, _ = compute_rates(detector[0])
+	plot_rate_curve(thresh_arr, tpr_arr, detector, target_axes,
+			"True Positive Rate", TPR_COLOUR)
+
+
+"""
+Function:    draw_figure
+Description: Draws and saves the TPR/FPR figure for all detectors.
+Inputs:      List of tuples, with the form (detector, rates), where
+	     detector is as in DETECTORS and rates is as from compute_rates.
+Outputs:     None
+"""
+def draw_figure(all_rates):
 	# Create PyPlot objects
 	fig, main_axes = plt.subplots(nrows = NROWS, ncols = NCOLS)
 	fig.suptitle(
@@ -234,10 +240,12 @@ def main():
 		ha = "left",
 	)
 
-	# Draw ROC for each detector
-	for detector in DETECTORS:
-		draw_tpr_curve(detector, main_axes)
-		draw_fpr_curve(detector, main_axes)
+	# Draw TPR and FPR for each detector
+	for detector, (thresh_arr, tpr_arr, fpr_arr) in all_rates:
+		plot_rate_curve(thresh_arr, tpr_arr, detector, main_axes,
+				"True Positive Rate", TPR_COLOUR)
+		plot_rate_curve(thresh_arr, fpr_arr, detector, main_axes,
+				"False Positive Rate", FPR_COLOUR)
 
 	# Create legend
 	handles, labels = plt.gca().get_legend_handles_labels()
@@ -249,6 +257,12 @@ def main():
 	# Render
 	plt.savefig("tpr_fpr.svg")
 	plt.savefig("tpr_fpr.png")
+
+
+# MAIN FUNCTION
+def main():
+	all_rates = [ (detector, compute_rates(detector[0])) for detector in DETECTORS ]
+	draw_figure(all_rates)
 	plt.show()
 
 